@@ -0,0 +1,129 @@
+import os
+import random
+import tempfile
+from argparse import ArgumentParser
+from collections import Counter
+from configparser import ConfigParser
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from crawler.priority import PriorityQueue, score_url, url_pattern
+from crawler.spill import SpillQueue
+
+# Replays a crawl with both frontier orders and reports how many unique
+# (non-duplicate) pages each fetched in the first N fetches. The link graph
+# is synthetic (several random seeds), or taken from a page store written by
+# a real crawl (--store).
+
+
+def synthetic_site(seed=7, hosts=40, pages_per_host=60, trap_pages=3000):
+    # Link graph with ordinary hosts, near-duplicate listing pages and one
+    # calendar-style trap. Returns (links, info, seeds); info[url] is the
+    # page_info the scraper would report for url.
+    rng = random.Random(seed)
+    links, info = {}, {}
+    host_names = [f"h{h}.ics.uci.edu" for h in range(hosts)]
+    for host in host_names:
+        pages = [f"https://{host}/" + "".join(rng.choices("abcdefghij", k=8))
+                 for _ in range(pages_per_host)]
+        pages[0] = f"https://{host}/index"
+        for page in pages:
+            links[page] = rng.sample(pages, 5) + [f"https://{rng.choice(host_names)}/index"]
+            info[page] = {"text_length": rng.randint(500, 8000), "duplicate": None}
+        # near-duplicate listings hanging off every host
+        listings = [f"https://{host}/list?id={i}" for i in range(20)]
+        links[pages[0]] += listings
+        for listing in listings:
+            links[listing] = listings[:3]
+            info[listing] = {"text_length": 400, "duplicate": "near"}
+    trap = [f"https://h0.ics.uci.edu/cal/day{d}" for d in range(trap_pages)]
+    links["https://h0.ics.uci.edu/index"] += [trap[0]]
+    for d, page in enumerate(trap):
+        links[page] = trap[d + 1:d + 3] + ["https://h0.ics.uci.edu/index"]
+        info[page] = {"text_length": 200, "duplicate": "near"}
+    # Links appear in no particular order on a page.
+    for page_links in links.values():
+        rng.shuffle(page_links)
+    return links, info, [f"https://{host_names[0]}/index"]
+
+
+def stored_site(config, store_dir):
+    # Link graph of a real crawl: every page in the page store, parsed again
+    # in store order (so duplicates are flagged as they were when crawling).
+    import scraper
+    from crawler.pagestore import PageStore
+    from utils.canonical import canonicalize
+
+    links, info = {}, {}
+    with PageStore(store_dir, readonly=True) as store:
+        for urlhash in store.hashes():
+            url, status, headers, content = store.get_by_hash(urlhash)
+            resp = SimpleNamespace(
+                url=url, status=status, error=None,
+                raw_response=SimpleNamespace(url=url, content=content, headers=headers))
+            page_info = {}
+            page_links, _ = scraper.scraper(url, resp, page_info)
+            links[url] = [canonicalize(link, config.strip_params, config.fold_index) for link in page_links]
+            info[url] = page_info
+    seeds = [canonicalize(url, config.strip_params, config.fold_index) for url in config.seed_urls]
+    return links, info, seeds
+
+
+def replay(queue, links, info, seeds, fetches):
+    # Crawl the synthetic graph in the order given by queue, as Frontier
+    # would, and return how many unique non-duplicate pages were fetched.
+    seen = set(seeds)
+    host_counts = Counter()
+    pattern_counts = Counter()
+    for url in seeds:
+        queue.push((url, 0), 0.0)
+    unique = 0
+    for _ in range(fetches):
+        if not queue:
+            break
+        url, depth = queue.pop()
+        page_info = info.get(url)
+        # Urls without info were never fetched (not in the page store).
+        if page_info is not None and page_info.get("duplicate") is None:
+            unique += 1
+        host_counts[urlsplit(url).netloc] += 1
+        for link in links.get(url, ()):
+            if link in seen:
+                continue
+            seen.add(link)
+            pattern = url_pattern(link)
+            score = score_url(depth + 1, host_counts[urlsplit(link).netloc],
+                              pattern_counts[pattern], page_info)
+            pattern_counts[pattern] += 1
+            queue.push((link, depth + 1), score)
+    return unique
+
+
+def compare(graphs, fetches):
+    with tempfile.TemporaryDirectory() as tmp:
+        lifo, scored = [], []
+        for links, info, seeds in graphs:
+            lifo.append(replay(SpillQueue(os.path.join(tmp, "lifo"), 1000), links, info, seeds, fetches))
+            scored.append(replay(PriorityQueue(os.path.join(tmp, "prio"), 1000), links, info, seeds, fetches))
+    return lifo, scored
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--config_file", type=str, default="config.ini")
+    parser.add_argument("--store", type=str, default=None, help="replay a page store instead")
+    parser.add_argument("--seeds", type=int, default=5, help="synthetic graphs to average over")
+    args = parser.parse_args()
+
+    if args.store:
+        from utils.config import Config
+        cparser = ConfigParser()
+        cparser.read(args.config_file)
+        graphs = [stored_site(Config(cparser), args.store)]
+    else:
+        graphs = [synthetic_site(seed) for seed in range(args.seeds)]
+    for fetches in (500, 1000, 2000):
+        lifo, scored = compare(graphs, fetches)
+        print(f"{fetches} fetches: lifo {sum(lifo) / len(lifo):.0f} unique pages "
+              f"({min(lifo)}-{max(lifo)}), priority {sum(scored) / len(scored):.0f} "
+              f"({min(scored)}-{max(scored)})")
@@ -0,0 +1,51 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import utils
+
+# Measures the time a worker spends per page on its logging calls with the
+# old synchronous handlers and with the queued logging in utils.get_logger.
+
+PAGES = 20000
+
+
+def sync_logger(name):
+    # utils.get_logger before logging went through LOG_QUEUE.
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    fh = logging.FileHandler(f"Logs/{name}.log")
+    fh.setLevel(logging.DEBUG)
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter(utils.LOG_FORMAT)
+    fh.setFormatter(formatter)
+    ch.setFormatter(formatter)
+    logger.addHandler(fh)
+    logger.addHandler(ch)
+    return logger
+
+
+def per_page(logger):
+    start = time.perf_counter()
+    for i in range(PAGES):
+        logger.info(f"Politeness delay: sleeping 0.12s for www.ics.uci.edu")
+        logger.info(
+            f"Downloaded https://www.ics.uci.edu/page{i}, status <200>, "
+            f"using cache ('styx.ics.uci.edu', 9000).")
+    return (time.perf_counter() - start) / PAGES * 1e6
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("Logs")
+        # Keep the console out of the measurement output.
+        sys.stderr = open(os.devnull, "w")
+        before = per_page(sync_logger("bench-sync"))
+        after = per_page(utils.get_logger("bench-queued"))
+        utils.stop_logging()
+        sys.stderr = sys.__stderr__
+    print(f"synchronous: {before:.1f} us/page, queued: {after:.1f} us/page")
@@ -1,6 +1,10 @@
+from threading import Lock
 from utils import get_logger
+from utils.download import DOWNLOAD_STATS
 from crawler.frontier import Frontier
 from crawler.worker import Worker
+from crawler.autoscale import Autoscaler, SaturationMonitor
+from crawler.sitemap import SitemapLoader
 
 class Crawler(object):
     def __init__(self, config, restart, frontier_factory=Frontier, worker_factory=Worker):
@@ -9,18 +13,74 @@ class Crawler(object):
         self.frontier = frontier_factory(config, restart)
         self.workers = list()
         self.worker_factory = worker_factory
+        self.workers_lock = Lock()
+        self._next_worker_id = 0
+        self.autoscaler = None
+        self.monitor = None
+        self.sitemaps = None
+
+    def add_worker(self):
+        with self.workers_lock:
+            worker = self.worker_factory(self._next_worker_id, self.config, self.frontier)
+            self._next_worker_id += 1
+            self.workers.append(worker)
+        worker.start()
+        return worker
+
+    def active_workers(self):
+        with self.workers_lock:
+            return [w for w in self.workers if w.is_alive() and not w.stop_requested]
+
+    def remove_workers(self, count):
+        # Newest workers stop first, after their current url.
+        for worker in self.active_workers()[-count:]:
+            worker.stop_requested = True
 
     def start_async(self):
-        self.workers = [
-            self.worker_factory(worker_id, self.config, self.frontier)
-            for worker_id in range(self.config.threads_count)]
-        for worker in self.workers:
-            worker.start()
+        self.monitor = SaturationMonitor(self, self.config)
+        self.monitor.start()
+        if self.config.sitemaps and self.frontier.freshly_seeded:
+            # Cold start: sitemap urls are queued while the workers run.
+            self.sitemaps = SitemapLoader(self.config, self.frontier)
+            self.sitemaps.start()
+        if self.config.min_threads == self.config.max_threads:
+            initial = self.config.max_threads
+        else:
+            # Few domains are known at the start; the autoscaler grows the pool.
+            initial = self.config.min_threads
+        for _ in range(initial):
+            self.add_worker()
+        if self.config.min_threads != self.config.max_threads:
+            self.autoscaler = Autoscaler(self, self.config)
+            self.autoscaler.start()
 
     def start(self):
         self.start_async()
         self.join()
 
     def join(self):
-        for worker in self.workers:
-            worker.join()
+        while True:
+            with self.workers_lock:
+                workers = list(self.workers)
+            for worker in workers:
+                worker.join()
+            if self.autoscaler is not None:
+                self.autoscaler.stop()
+                self.autoscaler.join()
+            with self.workers_lock:
+                # The autoscaler may have started a worker while we waited.
+                if len(self.workers) == len(workers):
+                    break
+        if self.sitemaps is not None:
+            self.sitemaps.join()
+        if self.monitor is not None:
+            self.monitor.stop()
+            self.monitor.join()
+        self.frontier.export_report()
+        self.logger.info(
+            f"Aborted {DOWNLOAD_STATS['aborted']} oversized downloads, "
+            f"avoided {DOWNLOAD_STATS['bytes_avoided']} bytes.")
+        if self.frontier.recrawl is not None:
+            self.logger.info(
+                f"Recrawl cache: {self.frontier.recrawl.hits} unchanged pages reused, "
+                f"{self.frontier.recrawl.misses} parsed.")
@@ -0,0 +1,125 @@
+import time
+from math import ceil
+from threading import Thread, Event
+
+from utils import get_logger
+
+# Process CPU time per wall second above which parsing is considered to be
+# saturating the interpreter (threads share one core under the GIL).
+CPU_SATURATION = 0.9
+# Most workers added or removed per decision.
+MAX_STEP = 2
+
+
+def target_workers(active, depth, ready_domains, latency, time_delay, cpu,
+                   min_workers, max_workers):
+    # Each ready domain can take one fetch per max(time_delay, latency)
+    # seconds and a worker completes one fetch per `latency` seconds, so by
+    # Little's law ready_domains * latency / max(time_delay, latency)
+    # workers keep every ready domain busy.
+    if latency:
+        target = ceil(ready_domains * latency / max(time_delay, latency))
+    else:
+        target = ready_domains
+    target = min(target, depth)
+    if cpu >= CPU_SATURATION or depth == 0:
+        # More threads would only queue up on the interpreter, or exit.
+        target = min(target, active)
+    target = max(active - MAX_STEP, min(active + MAX_STEP, target))
+    return max(min_workers, min(max_workers, target))
+
+
+class Autoscaler(Thread):
+    ''' Grows or shrinks the crawler's worker pool every `interval` seconds
+    between config.min_threads and config.max_threads. '''
+
+    def __init__(self, crawler, config, interval=5.0):
+        self.logger = get_logger("AUTOSCALER")
+        self.crawler = crawler
+        self.config = config
+        self.interval = interval
+        self._stopped = Event()
+        self._last_wall = time.time()
+        self._last_cpu = time.process_time()
+        super().__init__(daemon=True)
+
+    def stop(self):
+        self._stopped.set()
+
+    def sample(self):
+        now = time.time()
+        cpu_now = time.process_time()
+        cpu = (cpu_now - self._last_cpu) / max(now - self._last_wall, 1e-6)
+        self._last_wall, self._last_cpu = now, cpu_now
+
+        workers = self.crawler.active_workers()
+        latencies = [w.fetch_latency for w in workers if w.fetch_latency is not None]
+        return {
+            "active": len(workers),
+            "depth": self.crawler.frontier.depth(),
+            "ready_domains": self.crawler.frontier.ready_domains(now),
+            "latency": sum(latencies) / len(latencies) if latencies else None,
+            "cpu": cpu,
+        }
+
+    def step(self):
+        sample = self.sample()
+        target = target_workers(
+            sample["active"], sample["depth"], sample["ready_domains"],
+            sample["latency"], self.config.time_delay, sample["cpu"],
+            self.config.min_threads, self.config.max_threads)
+        if target == sample["active"]:
+            return
+        latency = f"{sample['latency']:.2f}s" if sample["latency"] is not None else "n/a"
+        self.logger.info(
+            f"Scaling workers {sample['active']} -> {target} "
+            f"(frontier {sample['depth']}, ready domains {sample['ready_domains']}, "
+            f"latency {latency}, cpu {sample['cpu']:.2f}).")
+        if target > sample["active"]:
+            for _ in range(target - sample["active"]):
+                self.crawler.add_worker()
+        else:
+            self.crawler.remove_workers(sample["active"] - target)
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            if not self.crawler.active_workers():
+                break
+            self.step()
+
+
+class SaturationMonitor(Thread):
+    ''' Logs how long after the crawl started every one of config.max_threads
+    workers was busy with a url at the same time. '''
+
+    def __init__(self, crawler, config, interval=0.5):
+        self.logger = get_logger("AUTOSCALER")
+        self.crawler = crawler
+        self.config = config
+        self.interval = interval
+        self.started = time.time()
+        self.saturated_after = None
+        self._stopped = Event()
+        super().__init__(daemon=True)
+
+    def stop(self):
+        self._stopped.set()
+
+    def check(self):
+        busy = sum(1 for w in self.crawler.active_workers() if w.busy)
+        if busy >= self.config.max_threads:
+            self.saturated_after = time.time() - self.started
+            self.logger.info(
+                f"Worker pool saturated ({busy} busy) "
+                f"{self.saturated_after:.1f}s after start, "
+                f"frontier {self.crawler.frontier.depth()}.")
+            return True
+        return False
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            if self.check():
+                return
+        self.logger.info(
+            f"Worker pool never saturated "
+            f"({time.time() - self.started:.1f}s after start).")
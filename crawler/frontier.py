@@ -1,18 +1,53 @@
 import os
+import heapq
+import itertools
 import shelve
 import time
 from threading import Thread, RLock
 from queue import Queue, Empty
 from urllib.parse import urlparse
-from utils import get_logger, get_urlhash, normalize
+from utils import get_logger, get_urlhash
+from utils.canonical import canonicalize
+from crawler.spill import SpillQueue
+from crawler.priority import PriorityQueue, score_url, url_pattern
+from crawler.retry import classify, backoff_delay, HostBreaker, TRANSIENT, HOST_FAILURES
+from crawler.recrawl import RecrawlCache
+from crawler.pagestore import PageStore
+from crawler.report import CrawlReport
 from scraper import is_valid
-from collections import defaultdict
+from collections import Counter
 
 class Frontier(object):
     def __init__(self, config, restart):
         self.logger = get_logger("FRONTIER")
         self.config = config
-        self.to_be_downloaded = list()
+        self.stop_words = {"a","about","above","after","again","against","all","am","an","and","any","are","aren't","as","at","be","because","been","before","being","below","between","both","but","by","can't","cannot","could","couldn't","did","didn't","do","does","doesn't","doing","don't","down","during","each","few","for","from","further","had","hadn't","has","hasn't","have","haven't","having","he","he'd","he'll","he's","her","here","here's","hers","herself","him","himself","his","how","how's","i","i'd","i'll","i'm","i've","if","in","into","is","isn't","it","it's","its","itself","let's","me","more","most","mustn't","my","myself","no","nor","not","of","off","on","once","only","or","other","ought","our","ours","ourselves","out","over","own","same","shan't","she","she'd","she'll","she's","should","shouldn't","so","some","such","than","that","that's","the","their","theirs","them","themselves","then","there","there's","these","they","they'd","they'll","they're","they've","this","those","through","to","too","under","until","up","very","was","wasn't","we","we'd","we'll","we're","we've","were","weren't","what","what's","when","when's","where","where's","which","while","who","who's","whom","why","why's","with","won't","would","wouldn't","you","you'd","you'll","you're","you've","your","yours","yourself","yourselves"}
+
+        # Entries are (url, depth, score). Urls past the in-memory window are
+        # spilled to compressed segments.
+        queue_type = PriorityQueue if self.config.frontier_order == "priority" else SpillQueue
+        self.to_be_downloaded = queue_type(
+            f"{self.config.save_file}.spill", self.config.frontier_memory)
+
+        # Signals used to score urls in priority order.
+        self.in_flight = {}  # url -> (depth, score) of urls handed to workers
+        self.report = CrawlReport()  # also holds per host completed counts
+        self._report_exported = 0
+        self.pattern_counts = Counter()
+        self.queued_per_host = Counter()  # for the autoscaler
+
+        # Failed urls waiting for a retry and urls of parked hosts, as a heap
+        # of (ready_at, seq, url, depth, score, parked). Counts mirror the
+        # save file.
+        self.delayed = []
+        self._delayed_seq = itertools.count()
+        self.breakers = {}  # host -> HostBreaker
+        self.retry_counts = {}  # urlhash -> failed attempts
+        # Background loaders (sitemaps) still adding urls; while any runs an
+        # empty queue does not end the crawl.
+        self.loaders = 0
+        # True when this run started from the seed urls.
+        self.freshly_seeded = False
         
         # Thread-safe structures
         self.domain_last_access = {}
@@ -32,19 +67,32 @@ class Frontier(object):
             os.remove(self.config.save_file)
         # Load existing save file, or create one if it does not exist.
         self.save = shelve.open(self.config.save_file)
+        # Results of earlier crawls, kept across --recrawl restarts.
+        self.recrawl = (
+            RecrawlCache(self.config.recrawl_file, restart and not self.config.recrawl)
+            if self.config.recrawl_file else None)
+        # Fetched pages kept for offline reprocessing (reprocess.py).
+        self.page_store = PageStore(self.config.page_store) if self.config.page_store else None
         if restart:
-            for url in self.config.seed_urls:
-                self.add_url(url)
-            self.save['longest_page'] = (None, 0)
-            self.save['subdomain_frequencies'] = defaultdict(int)
-            self.save['word_frequency'] = defaultdict(int)
+            self.add_urls(self.config.seed_urls)
+            self.freshly_seeded = True
+            self.save['report'] = self.report
+            self.save['retry_counts'] = {}
+            self.save['host_failures'] = {}
         else:
             # Set the frontier state with contents of save file.
+            if 'report' in self.save:
+                self.report = self.save['report']
+            elif self.save:
+                # Save file from before running reports; counted once here.
+                self.report = CrawlReport.from_save(self.save, self.stop_words)
+            self.retry_counts = dict(self.save.get('retry_counts', {}))
+            for host, state in self.save.get('host_failures', {}).items():
+                self.breakers[host] = self._new_breaker(*state)
             self._parse_save_file()
             if not self.save:
-                for url in self.config.seed_urls:
-                    self.add_url(url)
-        self.stop_words = {"a","about","above","after","again","against","all","am","an","and","any","are","aren't","as","at","be","because","been","before","being","below","between","both","but","by","can't","cannot","could","couldn't","did","didn't","do","does","doesn't","doing","don't","down","during","each","few","for","from","further","had","hadn't","has","hasn't","have","haven't","having","he","he'd","he'll","he's","her","here","here's","hers","herself","him","himself","his","how","how's","i","i'd","i'll","i'm","i've","if","in","into","is","isn't","it","it's","its","itself","let's","me","more","most","mustn't","my","myself","no","nor","not","of","off","on","once","only","or","other","ought","our","ours","ourselves","out","over","own","same","shan't","she","she'd","she'll","she's","should","shouldn't","so","some","such","than","that","that's","the","their","theirs","them","themselves","then","there","there's","these","they","they'd","they'll","they're","they've","this","those","through","to","too","under","until","up","very","was","wasn't","we","we'd","we'll","we're","we've","were","weren't","what","what's","when","when's","where","where's","which","while","who","who's","whom","why","why's","with","won't","would","wouldn't","you","you'd","you'll","you're","you've","your","yours","yourself","yourselves"}
+                self.add_urls(self.config.seed_urls)
+                self.freshly_seeded = True
 
     def _parse_save_file(self):
         ''' This function can be overridden for alternate saving techniques. '''
@@ -65,28 +113,213 @@ class Frontier(object):
             f"total urls discovered.")
         
         with self.frontier_lock:
-            self.to_be_downloaded.extend(urls_to_add)
+            # Depth from the seeds is not saved; resumed urls restart at 0.
+            for url in urls_to_add:
+                self._enqueue(url, 0, None)
+
+    def _enqueue(self, url, depth, page_info):
+        # Caller must hold frontier_lock.
+        pattern = url_pattern(url)
+        score = score_url(
+            depth, self.report.subdomains.get(urlparse(url).netloc.lower(), 0),
+            self.pattern_counts[pattern], page_info)
+        self.pattern_counts[pattern] += 1
+        self._requeue(url, depth, score)
+
+    def _requeue(self, url, depth, score):
+        # Caller must hold frontier_lock. Also used for urls coming back from
+        # self.delayed, which keep the score they were first queued with.
+        self.queued_per_host[urlparse(url).netloc.lower()] += 1
+        self.to_be_downloaded.push((url, depth, score), score)
+
+    def depth(self):
+        with self.frontier_lock:
+            return len(self.to_be_downloaded) + len(self.delayed)
+
+    def ready_domains(self, now=None):
+        # Number of hosts with queued urls that could be fetched right now:
+        # not in a politeness wait and not parked by their circuit breaker.
+        now = time.time() if now is None else now
+        with self.frontier_lock:
+            hosts = list(self.queued_per_host)
+            parked = {host for host, breaker in self.breakers.items() if breaker.open_until > now}
+        with self.domain_lock:
+            return sum(
+                1 for host in hosts
+                if host not in parked and self.domain_last_access.get(host, 0) <= now)
 
     def get_tbd_url(self):
+        abandoned = []  # urls of hosts given up on
+        try:
+            return self._next_url(abandoned)
+        finally:
+            if abandoned:
+                self._abandon(abandoned)
+
+    def _next_url(self, abandoned):
+        while True:
+            with self.frontier_lock:
+                now = time.time()
+                while self.delayed and self.delayed[0][0] <= now:
+                    _, _, url, depth, score, _ = heapq.heappop(self.delayed)
+                    self._requeue(url, depth, score)
+                while self.to_be_downloaded:
+                    url, depth, score = self.to_be_downloaded.pop()
+                    host = urlparse(url).netloc.lower()
+                    self.queued_per_host[host] -= 1
+                    if self.queued_per_host[host] <= 0:
+                        del self.queued_per_host[host]
+                    breaker = self._breaker(url)
+                    if breaker.given_up:
+                        abandoned.append(url)
+                        self.retry_counts.pop(get_urlhash(url), None)
+                        continue
+                    parked_until = breaker.allow(now)
+                    if parked_until:
+                        heapq.heappush(
+                            self.delayed, (parked_until, next(self._delayed_seq), url, depth, score, True))
+                        continue
+                    self.in_flight[url] = (depth, score)
+                    return url
+                if self.delayed:
+                    wait = self.delayed[0][0] - now
+                elif self.loaders:
+                    wait = 0.5
+                else:
+                    return None
+            # Only urls waiting for a retry or a parked host are left, or a
+            # loader may still add some.
+            time.sleep(min(wait, 1.0))
+
+    def add_loader(self):
         with self.frontier_lock:
-            try:
-                return self.to_be_downloaded.pop()
-            except IndexError:
-                return None
+            self.loaders += 1
+
+    def remove_loader(self):
+        with self.frontier_lock:
+            self.loaders -= 1
+
+    def _abandon(self, urls):
+        # Saved as done so a resumed crawl does not queue them again.
+        with self.save_lock:
+            for url in urls:
+                self.save[get_urlhash(url)] = (url, True)
+            self.save.sync()
+        self.logger.warning(f"Dropped {len(urls)} urls of unreachable hosts.")
+
+    def _new_breaker(self, *state):
+        return HostBreaker(
+            self.config.breaker_threshold, self.config.breaker_cooldown, *state,
+            max_cooldown=self.config.breaker_max_cooldown,
+            max_probes=self.config.breaker_max_probes)
 
-    def add_url(self, url):
-        url = normalize(url)
+    def _breaker(self, url):
+        # Caller must hold frontier_lock.
+        host = urlparse(url).netloc.lower()
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = self._new_breaker()
+        return breaker
+
+    def _release_parked(self, host, parked_only=True):
+        # Caller must hold frontier_lock. Makes the host's parked urls (or
+        # all its delayed urls) ready now: its breaker closed, or the host
+        # was given up on and its urls are to be dropped.
+        released = False
+        for i, entry in enumerate(self.delayed):
+            if (entry[5] or not parked_only) and urlparse(entry[2]).netloc.lower() == host:
+                self.delayed[i] = (0,) + entry[1:]
+                released = True
+        if released:
+            heapq.heapify(self.delayed)
+
+    def retry_if_failed(self, url, resp):
+        # Updates the host's circuit breaker with the outcome of a download
+        # and schedules a retry for transient failures. Returns True if the
+        # url was rescheduled, in which case it must not be marked complete.
+        kind = classify(resp)
         urlhash = get_urlhash(url)
-        add_to_frontier = False
+        with self.frontier_lock:
+            breaker = self._breaker(url)
+            if kind in HOST_FAILURES:
+                was_open = breaker.failures >= breaker.threshold
+                was_given_up = breaker.given_up
+                if breaker.record_failure() and not was_open:
+                    self.logger.warning(
+                        f"{breaker.failures} consecutive failures on {urlparse(url).netloc}, "
+                        f"parking it for {breaker.current_cooldown:.0f}s.")
+                if breaker.given_up and not was_given_up:
+                    self.logger.error(
+                        f"Giving up on {urlparse(url).netloc} after "
+                        f"{breaker.failed_probes} failed probes.")
+                    self._release_parked(urlparse(url).netloc.lower(), parked_only=False)
+                changed = True
+            else:
+                was_open = breaker.failures >= breaker.threshold
+                changed = breaker.record_success()
+                if was_open:
+                    self._release_parked(urlparse(url).netloc.lower())
+
+            attempts = self.retry_counts.get(urlhash, 0)
+            retry = kind in TRANSIENT and attempts < self.config.max_retries and not breaker.given_up
+            if retry:
+                self.retry_counts[urlhash] = attempts + 1
+                ready_at = time.time() + backoff_delay(attempts, self.config.retry_backoff)
+                depth, score = self.in_flight.pop(url, (0, 0.0))
+                heapq.heappush(self.delayed, (ready_at, next(self._delayed_seq), url, depth, score, False))
+                changed = True
+            elif urlhash in self.retry_counts:
+                if kind in TRANSIENT:
+                    self.logger.error(f"Giving up on {url} after {attempts} retries ({kind}).")
+                del self.retry_counts[urlhash]
+                changed = True
+
+            if changed:
+                retry_counts = dict(self.retry_counts)
+                host_failures = {
+                    host: breaker.state() for host, breaker in self.breakers.items()
+                    if breaker.failures}
+
+        if changed:
+            with self.save_lock:
+                self.save['retry_counts'] = retry_counts
+                self.save['host_failures'] = host_failures
+                self.save.sync()
+        return retry
+
+    def _canonicalize(self, url):
+        return canonicalize(url, self.config.strip_params, self.config.fold_index)
+
+    def add_url(self, url, parent=None, page_info=None):
+        self.add_urls([url], parent, page_info)
+
+    def add_urls(self, urls, parent=None, page_info=None):
+        # Dedupe the batch, check the save file under a single lock, sync
+        # once and enqueue once. parent is the page the urls were found on
+        # and page_info what the scraper reported about it.
+        batch = {}
+        for url in urls:
+            url = self._canonicalize(url)
+            batch.setdefault(get_urlhash(url), url)
+        if not batch:
+            return 0
+
+        new_urls = []
         with self.save_lock:
-            if urlhash not in self.save:
-                self.save[urlhash] = (url, False)
+            for urlhash, url in batch.items():
+                if urlhash not in self.save:
+                    self.save[urlhash] = (url, False)
+                    new_urls.append(url)
+            if new_urls:
+                self.report.page_discovered(len(new_urls))
                 self.save.sync()
-                add_to_frontier = True
 
-        if add_to_frontier:
+        if new_urls:
             with self.frontier_lock:
-                self.to_be_downloaded.append(url)
+                depth = self.in_flight.get(parent, (-1, None))[0] + 1 if parent else 0
+                for url in new_urls:
+                    self._enqueue(url, depth, page_info)
+        return len(new_urls)
     
     def mark_url_complete(self, url, word_count):
         urlhash = get_urlhash(url)
@@ -97,35 +330,44 @@ class Frontier(object):
                     f"Completed url {url}, but have not seen it before.")
                 return
             
-            if 'longest_page' not in self.save:
-                self.save['longest_page'] = (None, 0)
-            
-            if word_count > self.save['longest_page'][1]:
-                self.save['longest_page'] = (url, word_count)
-
+            self.report.page_completed(url, word_count)
+            # One report write per page, covering the log_* calls before it.
+            self._save_report()
             self.save[urlhash] = (url, True)
             self.save.sync()
+
+        with self.frontier_lock:
+            self.in_flight.pop(url, None)
     
+    # log_domain_count and log_word_counts only update the report in memory;
+    # it is saved by the following mark_url_complete.
     def log_domain_count(self, url):
-        domain = urlparse(url).netloc.lower()
         with self.save_lock:
-            if 'subdomain_frequencies' not in self.save:
-                self.save['subdomain_frequencies'] = defaultdict(int)
-            freq = self.save.get('subdomain_frequencies', defaultdict(int))
-            freq[domain] = freq.get(domain, 0) + 1
-            self.save['subdomain_frequencies'] = freq
-            self.save.sync()
+            self.report.domain_visited(url)
     
     def log_word_frequency(self, words):
+        self.log_word_counts(Counter(words))
+
+    def log_word_counts(self, counts):
         with self.save_lock:
-            if 'word_frequency' not in self.save:
-                self.save['word_frequency'] = defaultdict(int)
-            freq = self.save.get('word_frequency', defaultdict(int))
-            for word in words:
-                if word.lower() not in self.stop_words:
-                    freq[word] = freq.get(word, 0) + 1
-            self.save['word_frequency'] = freq
-            self.save.sync()
+            self.report.words_counted({
+                word: count for word, count in counts.items()
+                if word.lower() not in self.stop_words})
+
+    def _save_report(self):
+        # Caller must hold save_lock. The JSON export is rate limited.
+        self.save['report'] = self.report
+        now = time.time()
+        if self.config.report_file and now - self._report_exported >= self.config.report_interval:
+            self.report.export_json(self.config.report_file)
+            self._report_exported = now
+
+    def export_report(self):
+        # Final export once the crawl ends, regardless of the rate limit.
+        if self.config.report_file:
+            with self.save_lock:
+                self.report.export_json(self.config.report_file)
+                self._report_exported = time.time()
         
     def wait_for_politeness(self, url):
         try:
@@ -0,0 +1,153 @@
+import mmap
+import os
+import pickle
+import struct
+import zlib
+from hashlib import sha1
+from threading import RLock
+
+from requests.structures import CaseInsensitiveDict
+
+from utils import get_urlhash
+
+SEGMENT_BYTES = 64 * 1024 * 1024
+RECORD_HEADER = struct.Struct(">I")  # length of the compressed record
+
+
+class PageStore(object):
+    ''' Append-only store of fetched pages.
+
+    Pages are zlib-compressed and appended to numbered segment files; an
+    index log maps get_urlhash(url) to (segment, offset, length) and a digest
+    of the body. Reads go through mmap. A url stored twice resolves to its
+    latest copy; a copy with an unchanged body is not written again. '''
+
+    def __init__(self, directory, readonly=False, segment_bytes=SEGMENT_BYTES):
+        self.directory = directory
+        self.readonly = readonly
+        self.segment_bytes = segment_bytes
+        self.lock = RLock()
+        self.index = {}  # urlhash -> (segment, offset, length), in store order
+        self.digests = {}  # urlhash -> sha1 of the stored body
+        self._maps = {}
+        self._segment = 0
+        self._writer = None
+        self._index_writer = None
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"segment-{segment:06d}.dat")
+
+    def _load_index(self):
+        path = os.path.join(self.directory, "index")
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) not in (4, 5):
+                        continue  # torn write at the end of the log
+                    urlhash, segment, offset, length = parts[:4]
+                    self.index.pop(urlhash, None)
+                    self.index[urlhash] = (int(segment), int(offset), int(length))
+                    # Stores written before digests were kept have none.
+                    self.digests[urlhash] = parts[4] if len(parts) == 5 else None
+        if self.index:
+            self._segment = max(segment for segment, _, _ in self.index.values())
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, url):
+        return get_urlhash(url) in self.index
+
+    def put(self, url, status, headers, content):
+        # Returns False if the stored copy of url already has this body.
+        if self.readonly:
+            raise RuntimeError("Page store was opened read only.")
+        urlhash = get_urlhash(url)
+        digest = sha1(content).hexdigest()
+        with self.lock:
+            if self.digests.get(urlhash) == digest:
+                return False
+        payload = zlib.compress(pickle.dumps(
+            (url, status, dict(headers), content), pickle.HIGHEST_PROTOCOL))
+        with self.lock:
+            if self._writer is None:
+                self._writer = open(self._segment_path(self._segment), "ab")
+                self._index_writer = open(os.path.join(self.directory, "index"), "a")
+            if self._writer.tell() + RECORD_HEADER.size + len(payload) > self.segment_bytes and self._writer.tell():
+                self._writer.close()
+                self._segment += 1
+                self._writer = open(self._segment_path(self._segment), "ab")
+            offset = self._writer.tell()
+            self._writer.write(RECORD_HEADER.pack(len(payload)))
+            self._writer.write(payload)
+            self._writer.flush()
+            entry = (self._segment, offset, RECORD_HEADER.size + len(payload))
+            self._index_writer.write(f"{urlhash} {entry[0]} {entry[1]} {entry[2]} {digest}\n")
+            self._index_writer.flush()
+            self.index.pop(urlhash, None)
+            self.index[urlhash] = entry
+            self.digests[urlhash] = digest
+        return True
+
+    def put_response(self, url, resp):
+        # Stores a downloaded page if it is an HTML page the scraper would
+        # parse and its body changed since it was last stored.
+        raw = resp.raw_response
+        if resp.status != 200 or not raw or not raw.content:
+            return False
+        if "text/html" not in raw.headers.get("Content-Type", ""):
+            return False
+        return self.put(url, resp.status, raw.headers, raw.content)
+
+    def _map(self, segment, end):
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            # First read, or the segment grew since it was mapped.
+            if mapped is not None:
+                mapped.close()
+            with open(self._segment_path(segment), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+
+    def get_by_hash(self, urlhash):
+        # Returns (url, status, headers, content) or None. Headers are stored
+        # as a plain dict and given back case insensitive, like requests'.
+        with self.lock:
+            entry = self.index.get(urlhash)
+            if entry is None:
+                return None
+            segment, offset, length = entry
+            mapped = self._map(segment, offset + length)
+            (size,) = RECORD_HEADER.unpack_from(mapped, offset)
+            start = offset + RECORD_HEADER.size
+            payload = mapped[start:start + size]
+        url, status, headers, content = pickle.loads(zlib.decompress(payload))
+        return url, status, CaseInsensitiveDict(headers), content
+
+    def get(self, url):
+        return self.get_by_hash(get_urlhash(url))
+
+    def hashes(self):
+        # Url hashes in the order the pages were stored.
+        with self.lock:
+            return list(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            if self._writer is not None:
+                self._writer.close()
+                self._index_writer.close()
+                self._writer = self._index_writer = None
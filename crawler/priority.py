@@ -0,0 +1,103 @@
+import heapq
+import os
+import pickle
+import re
+import shutil
+import zlib
+from math import log1p
+from urllib.parse import urlsplit
+
+# Weights of the signals combined by score_url. Higher scores are crawled first.
+DEPTH_WEIGHT = 1.0
+HOST_WEIGHT = 0.5
+NOVELTY_WEIGHT = 3.0
+PARENT_TEXT_WEIGHT = 1.0
+PARENT_TEXT_SATURATION = 5000  # characters of text that count as a "full" page
+NEAR_DUPLICATE_PENALTY = 2.0
+EXACT_DUPLICATE_PENALTY = 3.0
+
+DIGITS = re.compile(r"\d+")
+
+
+def url_pattern(url):
+    # Shape of a url: host, path with numbers collapsed and the sorted query
+    # keys. Many urls sharing a pattern usually means a trap or a listing.
+    parts = urlsplit(url)
+    keys = sorted(param.split("=", 1)[0] for param in parts.query.split("&") if param)
+    return f"{parts.netloc}{DIGITS.sub('N', parts.path)}?{'&'.join(keys)}"
+
+
+def score_url(depth, host_completed, pattern_seen, parent_info=None):
+    score = -DEPTH_WEIGHT * depth
+    score -= HOST_WEIGHT * log1p(host_completed)
+    score -= NOVELTY_WEIGHT * log1p(pattern_seen)
+    if parent_info:
+        text_length = parent_info.get("text_length", 0)
+        score += PARENT_TEXT_WEIGHT * min(text_length / PARENT_TEXT_SATURATION, 1.0)
+        duplicate = parent_info.get("duplicate")
+        if duplicate == "exact":
+            score -= EXACT_DUPLICATE_PENALTY
+        elif duplicate == "near":
+            score -= NEAR_DUPLICATE_PENALTY
+    return score
+
+
+class PriorityQueue(object):
+    ''' Max-priority queue that keeps at most `window` entries in memory.
+
+    On overflow the lower-scored half of the heap is written to a compressed
+    segment. A segment is read back as soon as its best entry outranks the
+    in-memory top, so pop() order is exact. Not thread safe. '''
+
+    def __init__(self, spill_dir, window):
+        self.spill_dir = spill_dir
+        self.window = max(int(window), 2)
+        self.heap = list()  # (-score, seq, item)
+        self.segments = list()  # heap of (-best score, seq, path, count)
+        self.spilled = 0
+        self._seq = 0
+        self._next_segment = 0
+        if os.path.exists(self.spill_dir):
+            shutil.rmtree(self.spill_dir)
+
+    def __len__(self):
+        return len(self.heap) + self.spilled
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def push(self, item, score=0.0):
+        self._seq += 1
+        heapq.heappush(self.heap, (-score, self._seq, item))
+        if len(self.heap) > self.window:
+            self._spill()
+
+    def pop(self):
+        if self.segments and (not self.heap or self.segments[0][0] < self.heap[0][0]):
+            self._load()
+        return heapq.heappop(self.heap)[2]
+
+    def _spill(self):
+        # A sorted list is a valid heap, so the kept half needs no heapify.
+        self.heap.sort()
+        keep = self.window // 2
+        chunk = self.heap[keep:]
+        del self.heap[keep:]
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, f"segment-{self._next_segment:06d}.z")
+        self._next_segment += 1
+        with open(path, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL), 1))
+        heapq.heappush(self.segments, (chunk[0][0], self._next_segment, path, len(chunk)))
+        self.spilled += len(chunk)
+
+    def _load(self):
+        _, _, path, count = heapq.heappop(self.segments)
+        with open(path, "rb") as f:
+            chunk = pickle.loads(zlib.decompress(f.read()))
+        os.remove(path)
+        self.spilled -= count
+        for entry in chunk:
+            heapq.heappush(self.heap, entry)
+        if len(self.heap) > self.window:
+            self._spill()
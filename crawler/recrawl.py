@@ -0,0 +1,78 @@
+import os
+import shelve
+from collections import Counter
+from glob import glob
+from hashlib import sha1
+from threading import RLock
+
+from utils import get_urlhash
+
+
+class RecrawlCache(object):
+    ''' Per url results of earlier crawls, used to skip parsing pages that
+    did not change.
+
+    Each record holds the page's validators (ETag, Last-Modified), a digest
+    of the raw body, the text hash and simhash used for duplicate detection,
+    and what the scraper produced: the valid outlinks and the word counts. '''
+
+    def __init__(self, path, fresh):
+        self.path = path
+        self.lock = RLock()
+        self.hits = 0
+        self.misses = 0
+        if fresh:
+            # shelve may create several files with suffixes.
+            for existing in glob(f"{path}*"):
+                os.remove(existing)
+        self.db = shelve.open(path)
+
+    def lookup(self, url, resp):
+        # Returns the stored record if the downloaded page is unchanged.
+        if resp.status != 200 or not resp.raw_response or not resp.raw_response.content:
+            return None
+        urlhash = get_urlhash(url)
+        with self.lock:
+            record = self.db.get(urlhash)
+            if record is None:
+                self.misses += 1
+                return None
+
+        headers = resp.raw_response.headers
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if etag and etag == record["etag"]:
+            unchanged = True
+        elif last_modified and last_modified == record["last_modified"]:
+            unchanged = True
+        else:
+            unchanged = sha1(resp.raw_response.content).hexdigest() == record["body_hash"]
+        with self.lock:
+            if not unchanged:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return record
+
+    def store(self, url, resp, links, words, page_info):
+        if resp.status != 200 or not resp.raw_response or not resp.raw_response.content:
+            return
+        if page_info.get("duplicate") == "exact":
+            # Its links were dropped; parse it again next time, in case it
+            # is no longer a duplicate in that crawl's order.
+            return
+        headers = resp.raw_response.headers
+        record = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "body_hash": sha1(resp.raw_response.content).hexdigest(),
+            "content_hash": page_info.get("content_hash"),
+            "simhash": page_info.get("simhash"),
+            "page_info": dict(page_info),
+            "links": list(links),
+            "word_counts": Counter(words),
+            "word_total": len(words),
+        }
+        with self.lock:
+            self.db[get_urlhash(url)] = record
+            self.db.sync()
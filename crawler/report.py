@@ -0,0 +1,126 @@
+import heapq
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+# Words tracked by the heavy hitters sketch. The top 50 of a Zipf-like word
+# distribution are exact long before this fills up.
+WORD_CAPACITY = 5000
+
+
+class SpaceSaving(object):
+    ''' Space-Saving heavy hitters sketch (Metwally et al.).
+
+    Keeps at most `capacity` counters. An untracked item replaces the one
+    with the smallest count and inherits that count as its error, so every
+    reported count is an upper bound off by at most `error`. '''
+
+    def __init__(self, capacity=WORD_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []  # (count, item), may hold stale entries
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __getstate__(self):
+        # The heap is rebuilt on load; no need to pickle it with every save.
+        state = dict(self.__dict__)
+        state["_heap"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def update(self, item, count=1):
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            floor, evicted = self._pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i) for i, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        # Skip heap entries whose count has changed since they were pushed.
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+    def top(self, n):
+        return heapq.nlargest(n, self.counts.items(), key=lambda entry: entry[1])
+
+
+class CrawlReport(object):
+    ''' Running crawl statistics, updated as pages are discovered and
+    completed so the report can be read without scanning the save file. '''
+
+    def __init__(self):
+        self.unique_pages = 0  # urls discovered
+        self.completed_pages = 0
+        self.longest_page = (None, 0)
+        self.subdomains = {}
+        self.words = SpaceSaving()
+        self.updated = None
+
+    def page_discovered(self, count=1):
+        self.unique_pages += count
+
+    def page_completed(self, url, word_count):
+        self.completed_pages += 1
+        if word_count > self.longest_page[1]:
+            self.longest_page = (url, word_count)
+        self.updated = time.time()
+
+    def domain_visited(self, url):
+        domain = urlparse(url).netloc.lower()
+        self.subdomains[domain] = self.subdomains.get(domain, 0) + 1
+
+    def words_counted(self, counts):
+        for word, count in counts.items():
+            self.words.update(word, count)
+
+    def to_dict(self, top_words=50):
+        return {
+            "unique_pages": self.unique_pages,
+            "completed_pages": self.completed_pages,
+            "longest_page": {"url": self.longest_page[0], "words": self.longest_page[1]},
+            "top_words": [{"word": word, "count": count} for word, count in self.words.top(top_words)],
+            "subdomains": dict(sorted(self.subdomains.items())),
+            "updated": self.updated,
+        }
+
+    def export_json(self, path, top_words=50):
+        # Written to a temporary file first so readers never see a partial file.
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(top_words), f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_save(cls, save, stop_words=()):
+        # Builds the report from a save file written before reports existed.
+        report = cls()
+        for value in save.values():
+            if type(value) == tuple and len(value) == 2 and isinstance(value[1], bool):
+                report.unique_pages += 1
+                report.completed_pages += value[1]
+        report.longest_page = tuple(save.get('longest_page', (None, 0)))
+        report.subdomains = dict(save.get('subdomain_frequencies', {}))
+        report.words_counted({
+            word: count for word, count in save.get('word_frequency', {}).items()
+            if word.lower() not in stop_words})
+        return report
@@ -0,0 +1,100 @@
+import random
+import time
+
+from utils.download import TIMEOUT_STATUS, CONNECTION_ERROR_STATUS, DECODE_ERROR_STATUS
+
+TIMEOUT = "timeout"
+CONNECTION_ERROR = "connection"
+SERVER_ERROR = "5xx"
+CLIENT_ERROR = "4xx"
+DECODE_ERROR = "decode"
+
+# Failures worth another attempt. 4xx and the cache server's own 6xx codes
+# will not change on a retry.
+TRANSIENT = {TIMEOUT, CONNECTION_ERROR, SERVER_ERROR, DECODE_ERROR}
+# Failures that say something about the host rather than the url.
+HOST_FAILURES = {TIMEOUT, CONNECTION_ERROR, SERVER_ERROR}
+
+
+def classify(resp):
+    # Returns the kind of failure of a download, or None if it succeeded
+    # (or failed in a way that is not an error of the fetch itself).
+    if resp.status == TIMEOUT_STATUS:
+        return TIMEOUT
+    if resp.status == CONNECTION_ERROR_STATUS:
+        return CONNECTION_ERROR
+    if resp.status == DECODE_ERROR_STATUS:
+        return DECODE_ERROR
+    if 500 <= resp.status < 600:
+        return SERVER_ERROR
+    if 400 <= resp.status < 500:
+        return CLIENT_ERROR
+    return None
+
+
+def backoff_delay(attempt, base):
+    # Exponential backoff with jitter: base, 2*base, 4*base, ... (+-25%).
+    return base * (2 ** attempt) * random.uniform(0.75, 1.25)
+
+
+class HostBreaker(object):
+    ''' Circuit breaker for one host.
+
+    Closed until `threshold` consecutive host failures, then open for
+    `cooldown` seconds. After that a single probe url is let through
+    (half open); success closes the breaker, failure reopens it with the
+    cooldown doubled, up to `max_cooldown`. After `max_probes` failed
+    probes in a row the host is given up on. '''
+
+    def __init__(self, threshold, cooldown, failures=0, open_until=0.0, current_cooldown=None,
+                 failed_probes=0, max_cooldown=None, max_probes=None):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = failures
+        self.open_until = open_until
+        self.current_cooldown = current_cooldown or cooldown
+        self.failed_probes = failed_probes
+        self.max_cooldown = max_cooldown or float("inf")
+        self.max_probes = max_probes
+        self.probing = False
+
+    @property
+    def given_up(self):
+        return self.max_probes is not None and self.failed_probes >= self.max_probes
+
+    def allow(self, now=None):
+        # Returns 0 if a url on this host may be fetched now, otherwise the
+        # time at which to try again.
+        now = time.time() if now is None else now
+        if self.failures < self.threshold:
+            return 0
+        if now < self.open_until:
+            return self.open_until
+        if self.probing:
+            # Wait for the probe that is already in flight.
+            return now + min(self.current_cooldown, self.cooldown)
+        self.probing = True
+        return 0
+
+    def record_success(self):
+        changed = self.failures > 0
+        self.failures = 0
+        self.current_cooldown = self.cooldown
+        self.failed_probes = 0
+        self.open_until = 0.0
+        self.probing = False
+        return changed
+
+    def record_failure(self, now=None):
+        now = time.time() if now is None else now
+        self.failures += 1
+        if self.probing:
+            self.failed_probes += 1
+            self.current_cooldown = min(self.current_cooldown * 2, self.max_cooldown)
+        self.probing = False
+        if self.failures >= self.threshold:
+            self.open_until = now + self.current_cooldown
+        return self.failures >= self.threshold
+
+    def state(self):
+        return (self.failures, self.open_until, self.current_cooldown, self.failed_probes)
@@ -0,0 +1,138 @@
+import gzip
+import time
+import zlib
+from collections import deque
+from io import BytesIO
+from threading import Thread
+from urllib.parse import urlparse
+from xml.etree.ElementTree import iterparse, ParseError
+
+from scraper import is_valid, allowed_domain
+from utils import get_logger
+from utils.download import download
+
+GZIP_MAGIC = b"\x1f\x8b"
+# Most urls handed to Frontier.add_urls at once; a batch is also flushed
+# after every sitemap file so workers get urls early.
+BATCH_SIZE = 5000
+# Upper bound on sitemap files fetched per run (indexes included).
+MAX_SITEMAPS = 200
+
+
+def sitemaps_from_robots(text):
+    # "Sitemap:" lines of a robots.txt, in order.
+    sitemaps = []
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            sitemaps.append(value.strip())
+    return sitemaps
+
+
+def parse_sitemap(content):
+    # Streams (kind, loc) pairs out of a sitemap or sitemap index, plain or
+    # gzipped; kind is "sitemap" for index entries and "url" for pages.
+    stream = BytesIO(content)
+    if content[:2] == GZIP_MAGIC:
+        stream = gzip.GzipFile(fileobj=stream)
+    kind = None
+    try:
+        for event, elem in iterparse(stream, events=("start", "end")):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if event == "start":
+                if tag in ("sitemap", "url"):
+                    kind = tag
+            elif tag == "loc" and kind and elem.text:
+                yield kind, elem.text.strip()
+            elif tag in ("sitemap", "url"):
+                kind = None
+                elem.clear()  # keep memory flat on large sitemaps
+    except (ParseError, EOFError, OSError, zlib.error):
+        return
+
+
+def _in_scope(url):
+    parsed = urlparse(url)
+    return parsed.scheme in ("http", "https") and allowed_domain(parsed.netloc)
+
+
+class SitemapLoader(Thread):
+    ''' Seeds the frontier from the sitemaps of the seed domains, in the
+    background while the workers run.
+
+    Sitemaps are found through robots.txt, or at /sitemap.xml, and are
+    fetched through the cache server like any page. Only sitemaps on the
+    allowed domains are followed. '''
+
+    def __init__(self, config, frontier, fetch=download):
+        self.logger = get_logger("SITEMAP")
+        self.config = config
+        self.frontier = frontier
+        self.fetch = fetch
+        self.added = 0
+        super().__init__(daemon=True)
+
+    def start(self):
+        # Registered before the thread runs, so no worker sees an empty
+        # frontier and exits while sitemaps are still being read.
+        self.frontier.add_loader()
+        super().start()
+
+    def run(self):
+        try:
+            self.added = self.load()
+        except Exception as e:
+            self.logger.error(f"Sitemap loading failed: {e}")
+        finally:
+            self.frontier.remove_loader()
+
+    def _get(self, url):
+        self.frontier.wait_for_politeness(url)
+        resp = self.fetch(url, self.config, self.logger)
+        if resp.status != 200 or not resp.raw_response or not resp.raw_response.content:
+            return None
+        return resp.raw_response.content
+
+    def find_sitemaps(self, host):
+        for scheme in ("https", "http"):
+            robots = self._get(f"{scheme}://{host}/robots.txt")
+            if robots:
+                sitemaps = sitemaps_from_robots(robots.decode("utf-8", errors="replace"))
+                if sitemaps:
+                    return [sitemap for sitemap in sitemaps if _in_scope(sitemap)]
+                return [f"{scheme}://{host}/sitemap.xml"]
+        return [f"https://{host}/sitemap.xml"]
+
+    def load(self):
+        started = time.time()
+        hosts = list(dict.fromkeys(urlparse(url).netloc.lower() for url in self.config.seed_urls))
+        pending = deque(sitemap for host in hosts for sitemap in self.find_sitemaps(host))
+        seen = set()
+        batch = []
+        found = added = 0
+        while pending and len(seen) < MAX_SITEMAPS:
+            sitemap = pending.popleft()
+            if sitemap in seen:
+                continue
+            seen.add(sitemap)
+            content = self._get(sitemap)
+            if content is None:
+                continue
+            for kind, loc in parse_sitemap(content):
+                if kind == "sitemap":
+                    if _in_scope(loc):
+                        pending.append(loc)
+                    continue
+                found += 1
+                if is_valid(loc):
+                    batch.append(loc)
+                if len(batch) >= BATCH_SIZE:
+                    added += self.frontier.add_urls(batch)
+                    batch = []
+            if batch:
+                added += self.frontier.add_urls(batch)
+                batch = []
+        self.logger.info(
+            f"Read {len(seen)} sitemaps for {len(hosts)} domains in {time.time() - started:.1f}s: "
+            f"{found} urls listed, {added} new urls added to the frontier.")
+        return added
@@ -0,0 +1,67 @@
+import os
+import pickle
+import shutil
+import zlib
+
+
+class SpillQueue(object):
+    ''' LIFO queue that keeps at most `window` entries in memory.
+
+    When the in-memory window overflows, its oldest half is written to a
+    zlib-compressed segment file. Segments form a stack, so every entry on disk
+    is older than every entry in memory and pop() order is exactly that of a
+    plain list. Not thread safe; Frontier guards it with frontier_lock. '''
+
+    def __init__(self, spill_dir, window):
+        self.spill_dir = spill_dir
+        self.window = max(int(window), 2)
+        self.segment_size = self.window // 2
+        self.memory = list()
+        self.segments = list()  # (path, count), newest last
+        self.spilled = 0
+        self._next_segment = 0
+        # Segments never outlive a run; the save file is the source of truth.
+        if os.path.exists(self.spill_dir):
+            shutil.rmtree(self.spill_dir)
+
+    def __len__(self):
+        return len(self.memory) + self.spilled
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def append(self, item):
+        self.memory.append(item)
+        if len(self.memory) > self.window:
+            self._spill()
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def push(self, item, score=None):
+        # Same interface as PriorityQueue; the score is ignored.
+        self.append(item)
+
+    def pop(self):
+        if not self.memory and self.segments:
+            self._load()
+        return self.memory.pop()
+
+    def _spill(self):
+        chunk = self.memory[:self.segment_size]
+        del self.memory[:self.segment_size]
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, f"segment-{self._next_segment:06d}.z")
+        self._next_segment += 1
+        with open(path, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL), 1))
+        self.segments.append((path, len(chunk)))
+        self.spilled += len(chunk)
+
+    def _load(self):
+        path, count = self.segments.pop()
+        with open(path, "rb") as f:
+            self.memory = pickle.loads(zlib.decompress(f.read()))
+        os.remove(path)
+        self.spilled -= count
@@ -4,6 +4,7 @@ from utils.download import download
 from utils import get_logger
 import scraper
 import time
+from collections import Counter
 
 
 class Worker(Thread):
@@ -11,6 +12,12 @@ class Worker(Thread):
         self.logger = get_logger(f"Worker-{worker_id}", "Worker")
         self.config = config
         self.frontier = frontier
+        # Set by the autoscaler to retire this worker after its current url.
+        self.stop_requested = False
+        # Moving average of seconds per page, politeness wait excluded.
+        self.fetch_latency = None
+        # True while a url is being fetched and parsed.
+        self.busy = False
         # basic check for requests in scraper
         assert {getsource(scraper).find(req) for req in {"from requests import", "import requests"}} == {-1}, "Do not use requests in scraper.py"
         assert {getsource(scraper).find(req) for req in {"from urllib.request import", "import urllib.request"}} == {-1}, "Do not use urllib.request in scraper.py"
@@ -18,21 +25,51 @@ class Worker(Thread):
         
     def run(self):
         while True:
+            self.busy = False
+            if self.stop_requested:
+                self.logger.info("Stopping on autoscaler request.")
+                break
             tbd_url = self.frontier.get_tbd_url()
             if not tbd_url:
                 self.logger.info("Frontier is empty. Stopping Crawler.")
                 break
+            self.busy = True
 
             self.frontier.wait_for_politeness(tbd_url)
+            started = time.time()
             resp = download(tbd_url, self.config, self.logger)
 
             self.logger.info(
                 f"Downloaded {tbd_url}, status <{resp.status}>, "
                 f"using cache {self.config.cache_server}.")
-            scraped_urls, words = scraper.scraper(tbd_url, resp)
-            for scraped_url in scraped_urls:
-                self.frontier.add_url(scraped_url)
-            self.frontier.mark_url_complete(tbd_url, len(words))
+            if self.frontier.retry_if_failed(tbd_url, resp):
+                continue
+            if self.frontier.page_store is not None:
+                self.frontier.page_store.put_response(tbd_url, resp)
+            recrawl = self.frontier.recrawl
+            cached = recrawl.lookup(tbd_url, resp) if recrawl else None
+            if cached:
+                # Unchanged since the last crawl: reuse its parse results, but
+                # decide duplicates against the pages of this crawl.
+                page_info = dict(cached["page_info"])
+                page_info["duplicate"] = scraper.duplicate_status(cached["content_hash"], cached["simhash"])
+                scraped_urls = [] if page_info["duplicate"] == "exact" else cached["links"]
+                word_counts, word_total = cached["word_counts"], cached["word_total"]
+            else:
+                page_info = {}
+                scraped_urls, words = scraper.scraper(tbd_url, resp, page_info)
+                if recrawl:
+                    recrawl.store(tbd_url, resp, scraped_urls, words, page_info)
+                word_counts, word_total = Counter(words), len(words)
+            self.frontier.add_urls(scraped_urls, tbd_url, page_info)
             self.frontier.log_domain_count(tbd_url)
-            self.frontier.log_word_frequency(words)
+            self.frontier.log_word_counts(word_counts)
+            self.frontier.mark_url_complete(tbd_url, word_total)
+            self._record_latency(time.time() - started)
             #time.sleep(self.config.time_delay)
+
+    def _record_latency(self, seconds):
+        if self.fetch_latency is None:
+            self.fetch_latency = seconds
+        else:
+            self.fetch_latency = 0.8 * self.fetch_latency + 0.2 * seconds
@@ -6,10 +6,13 @@ from utils.config import Config
 from crawler import Crawler
 
 
-def main(config_file, restart):
+def main(config_file, restart, recrawl=False):
     cparser = ConfigParser()
     cparser.read(config_file)
     config = Config(cparser)
+    # A recrawl starts from the seeds but keeps the recrawl cache.
+    config.recrawl = recrawl
+    restart = restart or recrawl
     config.cache_server = get_cache_server(config, restart)
     crawler = Crawler(config, restart)
     crawler.start()
@@ -18,6 +21,7 @@ def main(config_file, restart):
 if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument("--restart", action="store_true", default=False)
+    parser.add_argument("--recrawl", action="store_true", default=False)
     parser.add_argument("--config_file", type=str, default="config.ini")
     args = parser.parse_args()
-    main(args.config_file, args.restart)
+    main(args.config_file, args.restart, args.recrawl)
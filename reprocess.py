@@ -0,0 +1,113 @@
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from configparser import ConfigParser
+from multiprocessing import Pool
+from types import SimpleNamespace
+
+import scraper
+from crawler.frontier import Frontier
+from crawler.pagestore import PageStore
+from utils.boilerplate import TemplateCache
+from utils.config import Config
+
+# Rebuilds crawl statistics and frontier decisions from the page store,
+# without any network traffic. Pages are parsed in parallel processes; the
+# duplicate checks and the host templates, which depend on crawl order, are
+# decided in this process in the order the pages were stored.
+
+_store = None
+
+
+def _open_store(directory, templates=None):
+    global _store
+    _store = PageStore(directory, readonly=True)
+    if templates is not None:
+        # Templates learned by the first pass; workers only strip them.
+        scraper.TEMPLATES.templates = templates
+        scraper.TEMPLATES.frozen = True
+
+
+def _response(urlhash):
+    url, status, headers, content = _store.get_by_hash(urlhash)
+    # Every page is seen as new here; duplicates are decided by the caller.
+    scraper.SEEN_EXACT_HASHES.clear()
+    scraper.SEEN_SIMHASHES.clear()
+    return url, SimpleNamespace(
+        url=url, status=status, error=None,
+        raw_response=SimpleNamespace(url=url, content=content, headers=headers))
+
+
+def _blocks(urlhash):
+    # First pass: the template block hashes of one page, per host.
+    scraper.TEMPLATES = TemplateCache()
+    scraper.scraper(*_response(urlhash))
+    return [(host, list(counts)) for host, counts in scraper.TEMPLATES.counts.items()]
+
+
+def _parse(urlhash):
+    url, resp = _response(urlhash)
+    page_info = {}
+    links, words = scraper.scraper(url, resp, page_info)
+    return url, links, Counter(words), len(words), page_info
+
+
+def reprocess(config, store_dir, processes=None):
+    config.recrawl_file = ""
+    config.page_store = ""
+    config.report_file = ""
+    frontier = Frontier(config, restart=True)
+    with PageStore(store_dir, readonly=True) as store:
+        hashes = store.hashes()
+
+    started = time.time()
+    # Templates are learned from all pages in store order before any page is
+    # stripped, so the result does not depend on how pages are split between
+    # processes.
+    templates = TemplateCache()
+    with Pool(processes, initializer=_open_store, initargs=(store_dir,)) as pool:
+        for blocks in pool.imap(_blocks, hashes, chunksize=32):
+            for host, digests in blocks:
+                templates.learn(host, digests)
+
+    duplicates = 0
+    with Pool(processes, initializer=_open_store, initargs=(store_dir, templates.templates)) as pool:
+        for url, links, word_counts, word_total, page_info in pool.imap(_parse, hashes, chunksize=32):
+            page_info["duplicate"] = scraper.duplicate_status(
+                page_info.get("content_hash"), page_info.get("simhash"))
+            if page_info["duplicate"] == "exact":
+                links = []
+            if page_info["duplicate"]:
+                duplicates += 1
+            frontier.add_url(url)
+            frontier.add_urls(links, url, page_info)
+            frontier.log_domain_count(url)
+            frontier.log_word_counts(word_counts)
+            frontier.mark_url_complete(url, word_total)
+
+    elapsed = time.time() - started
+    pending = sum(
+        1 for value in frontier.save.values()
+        if type(value) == tuple and not value[1])
+    print(f"Reprocessed {len(hashes)} stored pages in {elapsed:.1f}s "
+          f"({duplicates} duplicates), {pending} discovered urls not stored. "
+          f"Stats written to {config.save_file}.")
+    frontier.report.export_json(f"{config.save_file}.json")
+    frontier.save.close()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--config_file", type=str, default="config.ini")
+    parser.add_argument("--store", type=str, default=None, help="defaults to PAGESTORE")
+    parser.add_argument("--save", type=str, default="reprocess.shelve", help="save file to write")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    cparser = ConfigParser()
+    cparser.read(args.config_file)
+    config = Config(cparser)
+    store_dir = args.store or config.page_store
+    assert store_dir, "Set PAGESTORE in the config file or pass --store"
+    config.save_file = args.save
+    reprocess(config, store_dir, args.processes)
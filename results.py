@@ -1,32 +1,37 @@
+import json
 import shelve
+import sys
+
+from crawler.report import CrawlReport
 
 SHELVE_FILE = "frontier.shelve"
-save = shelve.open(SHELVE_FILE)
+save = shelve.open(SHELVE_FILE, "r")
+# The frontier keeps the report up to date while crawling; older save files
+# are converted once.
+report = save['report'] if 'report' in save else CrawlReport.from_save(save)
+
 def num_unique_pages():
-    print("Number of unique pages: ", len(save.keys()) - 3)
+    print("Number of unique pages: ", report.unique_pages)
 
 def longest_page():
-    print("Longest page: ", save['longest_page'])
+    print("Longest page: ", report.longest_page)
 
 def most_common_words(limit=50):
     print(f"{limit} most common words: ")
-    n = 0
-    word_frequencies = save['word_frequency'].items()
-    for k, v in word_frequencies:
-        if n == limit: break
+    for k, v in report.words.top(limit):
         print(f"{k}: {v}  ", end='')
-        n += 1
     print()
 
 def subdomains():
-    subdomain_freqs = save['subdomain_frequencies']
-    print(f"{len(subdomain_freqs.keys())} subdomains found:")
-    for subdomain, freq in sorted(subdomain_freqs.items(), key=lambda item: item[0]):
+    print(f"{len(report.subdomains)} subdomains found:")
+    for subdomain, freq in sorted(report.subdomains.items(), key=lambda item: item[0]):
         print(f"{subdomain}, {freq}")
 
 if __name__ == "__main__":
-    num_unique_pages()
-    longest_page()
-    most_common_words()
-    subdomains()
-
+    if "--json" in sys.argv[1:]:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        num_unique_pages()
+        longest_page()
+        most_common_words()
+        subdomains()
@@ -3,15 +3,19 @@ import re
 from urllib.parse import urlparse, urljoin
 from bs4 import BeautifulSoup
 from threading import Lock
+from utils.boilerplate import TemplateCache
+from utils.charset import decode_html
 
 SEEN_EXACT_HASHES = set()
 SEEN_SIMHASHES = set()
 SIMHASH_DIFF_THRESHOLD = 2
 SEEN_EXACT_HASHES_LOCK = Lock()
 SEEN_SIMHASHES_LOCK = Lock()
+TEMPLATES = TemplateCache()
+ALLOWED_DOMAINS = [".ics.uci.edu", ".cs.uci.edu", ".informatics.uci.edu", ".stat.uci.edu"]
 
-def scraper(url, resp):
-    links, words = extract_next_links(url, resp)
+def scraper(url, resp, page_info=None):
+    links, words = extract_next_links(url, resp, page_info=page_info)
     return [link for link in links if is_valid(link)], words
 
 def tokenize(text: str) -> list[str]:
@@ -31,7 +35,7 @@ def tokenize(text: str) -> list[str]:
 
     return tokens
 
-def extract_next_links(url, resp, min_text_length=300):
+def extract_next_links(url, resp, min_text_length=300, page_info=None):
     # Implementation required.
     # url: the URL that was used to get the page
     # resp.url: the actual url of the page
@@ -40,6 +44,8 @@ def extract_next_links(url, resp, min_text_length=300):
     # resp.raw_response: this is where the page actually is. More specifically, the raw_response has two parts:
     #         resp.raw_response.url: the url, again
     #         resp.raw_response.content: the content of the page!
+    # page_info: optional dict, filled with the page's text_length and its
+    #         duplicate status (None, "near" or "exact") for the frontier.
     
     if resp.status != 200 or not resp.raw_response or not resp.raw_response.content:
         return [], []
@@ -56,7 +62,11 @@ def extract_next_links(url, resp, min_text_length=300):
     links = set()
     
     try:
-        soup = BeautifulSoup(resp.raw_response.content, 'html.parser')
+        # decode once from the declared charset; bs4 only sniffs if that fails
+        html, encoding = decode_html(resp.raw_response.content, content_type)
+        if page_info is not None:
+            page_info["encoding"] = encoding
+        soup = BeautifulSoup(html, 'html.parser')
 
         a_tags = soup.find_all('a', href=True)
         for anchor in a_tags:
@@ -69,18 +79,36 @@ def extract_next_links(url, resp, min_text_length=300):
             if absolute_url:
                 links.add(absolute_url)
 
+        # drop the host's repeated header/navigation/footer blocks so they are
+        # not counted as words or in the fingerprints (links are kept above)
+        removed = TEMPLATES.strip(urlparse(resp.url).netloc.lower(), soup)
+        if page_info is not None:
+            page_info["boilerplate_blocks"] = removed
+
         # check if page has little text; avoid crawling
         text = soup.get_text(separator=' ', strip=True)
         words = tokenize(text)
+        if page_info is not None:
+            page_info["text_length"] = len(text)
+            page_info["duplicate"] = None
 
         if len(text) < min_text_length:
             return list(links), words
 
-        if exact_duplicate(text):
+        content_hash = text_hash(text)
+        if page_info is not None:
+            page_info["content_hash"] = content_hash
+        if seen_text_hash(content_hash):
+            if page_info is not None:
+                page_info["duplicate"] = "exact"
             return [], words
 
         document_fingerprint = compute_simhash(words)
+        if page_info is not None:
+            page_info["simhash"] = document_fingerprint
         if near_duplicate(document_fingerprint):
+            if page_info is not None:
+                page_info["duplicate"] = "near"
             return list(links), words
 
 
@@ -91,6 +119,10 @@ def extract_next_links(url, resp, min_text_length=300):
         
     return [], []
 
+def allowed_domain(netloc):
+    netloc_lower = netloc.lower()
+    return any(netloc_lower.endswith(domain) or netloc_lower == domain[1:] for domain in ALLOWED_DOMAINS)
+
 def is_valid(url):
     # Decide whether to crawl this url or not. 
     # If you decide to crawl it, return True; otherwise return False.
@@ -101,9 +133,7 @@ def is_valid(url):
             return False
         
         # check if domain is one of the allowed domains
-        allowed_domains = [".ics.uci.edu", ".cs.uci.edu", ".informatics.uci.edu", ".stat.uci.edu"]
-        netloc_lower = parsed.netloc.lower()
-        if not any(netloc_lower.endswith(domain) or netloc_lower == domain[1:] for domain in allowed_domains):
+        if not allowed_domain(parsed.netloc):
             return False
         
         # url too long, probably deep in a file dump
@@ -189,7 +219,10 @@ def is_valid(url):
 
 def exact_duplicate(text):
     # Duplicate detection using normalized text (all lowercase, extra spacing removed).
-    # Uses a checksum-style polynomial rolling hash.
+    return seen_text_hash(text_hash(text))
+
+def text_hash(text):
+    # Checksum-style polynomial rolling hash of the normalized text.
 
     normalized = re.sub(r"\s+", " ", text.lower()).strip()
 
@@ -200,6 +233,10 @@ def exact_duplicate(text):
     for ch in normalized:
         h = (h * base + ord(ch)) % mod
 
+    return h
+
+def seen_text_hash(h):
+    # Returns True if the text hash was already seen, and records it.
     with SEEN_EXACT_HASHES_LOCK:
         if h in SEEN_EXACT_HASHES:
             return True
@@ -268,3 +305,13 @@ def near_duplicate(simhash):
 
     return False
 
+def duplicate_status(content_hash, simhash=None):
+    # Duplicate check for a page that was not parsed again (e.g. an unchanged
+    # page on a recrawl), in the same order as extract_next_links. Records
+    # its fingerprints and returns None, "near" or "exact".
+    if content_hash is not None and seen_text_hash(content_hash):
+        return "exact"
+    if simhash is not None and near_duplicate(simhash):
+        return "near"
+    return None
+
@@ -0,0 +1,38 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.autoscale import target_workers
+
+
+class TestTargetWorkers(unittest.TestCase):
+
+    def target(self, active, depth=1000, ready=10, latency=1.0, cpu=0.2):
+        return target_workers(active, depth, ready, latency, 0.5, cpu, 2, 8)
+
+    def test_grows_with_ready_domains(self):
+        self.assertEqual(self.target(2, ready=40), 4)
+        self.assertEqual(self.target(7, ready=40), 8)
+
+    def test_shrinks_during_seed_phase(self):
+        self.assertEqual(self.target(6, ready=1), 4)
+        self.assertEqual(self.target(3, ready=1), 2)
+
+    def test_fast_fetches_need_fewer_workers(self):
+        # 4 ready domains, fetches take half the politeness delay
+        self.assertEqual(self.target(4, ready=4, latency=0.25), 2)
+
+    def test_no_growth_when_cpu_saturated(self):
+        self.assertEqual(self.target(3, ready=40, cpu=0.95), 3)
+
+    def test_no_growth_on_empty_frontier(self):
+        self.assertEqual(self.target(3, depth=0, ready=0), 2)
+        self.assertEqual(self.target(2, depth=0, ready=0), 2)
+
+    def test_unknown_latency(self):
+        self.assertEqual(self.target(2, ready=3, latency=None), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
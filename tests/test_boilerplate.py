@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.boilerplate import TemplateCache, candidate_blocks, block_hash
+
+
+def page(body):
+    return BeautifulSoup(f'''
+        <html><body>
+            <header><nav><a href="/">Home</a> Explore Contact Directory</nav></header>
+            <div class="sidebar-menu"><ul><li>Tutoring</li><li>Resources</li></ul></div>
+            <main><p>{body}</p></main>
+            <footer>Donald Bren School of Information and Computer Sciences</footer>
+        </body></html>''', 'html.parser')
+
+
+class TestTemplateCache(unittest.TestCase):
+
+    def test_outermost_candidates(self):
+        blocks = candidate_blocks(page("text"))
+        self.assertEqual([block.name for block in blocks], ["header", "div", "footer"])
+
+    def test_blocks_removed_after_min_pages(self):
+        cache = TemplateCache(min_pages=3)
+        self.assertEqual(cache.strip("www.stat.uci.edu", page("first")), 0)
+        self.assertEqual(cache.strip("www.stat.uci.edu", page("second")), 0)
+        soup = page("third page body")
+        self.assertEqual(cache.strip("www.stat.uci.edu", soup), 3)
+        self.assertEqual(soup.get_text(" ", strip=True), "third page body")
+
+    def test_hosts_learned_separately(self):
+        cache = TemplateCache(min_pages=2)
+        cache.strip("www.stat.uci.edu", page("a"))
+        self.assertEqual(cache.strip("www.ics.uci.edu", page("b")), 0)
+        self.assertEqual(cache.strip("www.stat.uci.edu", page("c")), 3)
+
+    def test_changing_block_kept(self):
+        cache = TemplateCache(min_pages=2)
+        for i in range(3):
+            soup = BeautifulSoup(f"<nav>Same menu</nav><footer>Updated {i}</footer><p>x</p>", 'html.parser')
+            cache.strip("www.ics.uci.edu", soup)
+        self.assertIn("Updated 2", soup.get_text())
+        self.assertNotIn("Same menu", soup.get_text())
+
+    def test_frozen_strips_learned_templates_only(self):
+        cache = TemplateCache(min_pages=2)
+        digests = [block_hash(block.get_text(" ", strip=True)) for block in candidate_blocks(page("a"))]
+        cache.learn("www.stat.uci.edu", digests)
+        cache.learn("www.stat.uci.edu", digests)
+        cache.frozen = True
+        self.assertEqual(cache.strip("www.stat.uci.edu", page("b")), 3)
+        self.assertEqual(cache.strip("www.ics.uci.edu", page("c")), 0)
+        self.assertEqual(cache.strip("www.ics.uci.edu", page("d")), 0)
+        self.assertNotIn("www.ics.uci.edu", cache.counts)
+
+    def test_blocks_bounded(self):
+        cache = TemplateCache(min_pages=2, max_blocks=20)
+        for i in range(200):
+            # Every page repeats the menu, and each footer is on two pages.
+            soup = BeautifulSoup(f"<nav>Same menu</nav><footer>Note {i // 2}</footer><p>x</p>", 'html.parser')
+            cache.strip("www.ics.uci.edu", soup)
+            self.assertLessEqual(len(cache.counts["www.ics.uci.edu"]), 20)
+            self.assertLessEqual(len(cache.templates["www.ics.uci.edu"]), 20)
+        self.assertNotIn("Same menu", soup.get_text())
+        # Blocks first seen after the bound was reached are still learned.
+        self.assertNotIn("Note 99", soup.get_text())
+
+
+if __name__ == '__main__':
+    unittest.main()
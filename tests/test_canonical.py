@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.canonical import canonicalize, count_duplicates
+
+
+class TestCanonicalize(unittest.TestCase):
+
+    def test_host_and_default_port(self):
+        self.assertEqual(canonicalize("HTTP://WWW.ICS.UCI.EDU:80/About"), "http://www.ics.uci.edu/About")
+        self.assertEqual(canonicalize("https://ics.uci.edu:443/"), "https://ics.uci.edu")
+        self.assertEqual(canonicalize("https://ics.uci.edu:8443/a"), "https://ics.uci.edu:8443/a")
+
+    def test_ipv6_host(self):
+        self.assertEqual(canonicalize("http://[::1]:8080/a"), "http://[::1]:8080/a")
+        self.assertEqual(canonicalize("https://[2001:DB8::1]:443/"), "https://[2001:db8::1]")
+
+    def test_dot_segments(self):
+        self.assertEqual(canonicalize("https://ics.uci.edu/a/./b/../c"), "https://ics.uci.edu/a/c")
+        self.assertEqual(canonicalize("https://ics.uci.edu/../a"), "https://ics.uci.edu/a")
+
+    def test_percent_encoding(self):
+        self.assertEqual(canonicalize("https://ics.uci.edu/%7Eeppstein/"), "https://ics.uci.edu/~eppstein")
+        self.assertEqual(canonicalize("https://ics.uci.edu/a%2fb"), "https://ics.uci.edu/a%2Fb")
+
+    def test_query_sorted_and_stripped(self):
+        self.assertEqual(
+            canonicalize("https://ics.uci.edu/p?utm_source=x&b=1&a=2&PHPSESSID=abc"),
+            "https://ics.uci.edu/p?a=2&b=1")
+        self.assertEqual(canonicalize("https://ics.uci.edu/p?utm_source=x"), "https://ics.uci.edu/p")
+
+    def test_custom_strip_params(self):
+        self.assertEqual(
+            canonicalize("https://ics.uci.edu/p?id=1&ref=home", frozenset({"ref"})),
+            "https://ics.uci.edu/p?id=1")
+
+    def test_fragment_removed(self):
+        self.assertEqual(canonicalize("https://ics.uci.edu/page#top"), "https://ics.uci.edu/page")
+
+    def test_fold_index(self):
+        url = "https://www.stat.uci.edu/covid19/index.html"
+        self.assertEqual(canonicalize(url), url)
+        self.assertEqual(canonicalize(url, fold_index=True), "https://www.stat.uci.edu/covid19")
+        self.assertEqual(
+            canonicalize("https://ics.uci.edu/myindex.html", fold_index=True),
+            "https://ics.uci.edu/myindex.html")
+
+    def test_count_duplicates(self):
+        duplicates, unique = count_duplicates([
+            "http://WWW.ics.uci.edu:80/a/./b?utm_source=x&b=1&a=2",
+            "http://www.ics.uci.edu/a/b?a=2&b=1",
+            "http://www.ics.uci.edu/a/b/?b=1&a=2#x",
+            "http://www.ics.uci.edu/c",
+        ])
+        self.assertEqual((duplicates, unique), (2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
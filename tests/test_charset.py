@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.charset import declared_charset, decode_html
+
+
+class TestDeclaredCharset(unittest.TestCase):
+
+    def test_header(self):
+        self.assertEqual(declared_charset(b"", "text/html; charset=UTF-8"), "utf-8")
+        self.assertEqual(declared_charset(b"", 'text/html; charset="windows-1252"'), "cp1252")
+
+    def test_meta(self):
+        self.assertEqual(declared_charset(b'<html><head><meta charset="iso-8859-1">', "text/html"), "cp1252")
+        self.assertEqual(declared_charset(
+            b'<meta http-equiv="Content-Type" content="text/html; charset=shift_jis">', "text/html"), "shift_jis")
+
+    def test_meta_beyond_prefix_ignored(self):
+        self.assertIsNone(declared_charset(b" " * 4096 + b'<meta charset="koi8-r">', "text/html"))
+
+    def test_header_wins_over_meta(self):
+        self.assertEqual(declared_charset(b'<meta charset="koi8-r">', "text/html; charset=utf-8"), "utf-8")
+
+    def test_unknown_label(self):
+        self.assertIsNone(declared_charset(b'<meta charset="no-such-codec">', "text/html; charset=bogus"))
+
+
+class TestDecodeHtml(unittest.TestCase):
+
+    def test_utf8_fast_path(self):
+        self.assertEqual(decode_html("café".encode("utf-8"), "text/html"), ("café", "utf-8"))
+        self.assertEqual(decode_html(b"plain", "text/html; charset=us-ascii"), ("plain", "utf-8"))
+
+    def test_declared_charset(self):
+        content = '<meta charset="windows-1252"><p>“quoted”</p>'.encode("cp1252")
+        self.assertEqual(decode_html(content, "text/html"), ('<meta charset="windows-1252"><p>“quoted”</p>', "cp1252"))
+
+    def test_bom(self):
+        self.assertEqual(decode_html(b"\xef\xbb\xbfhi", "text/html; charset=cp1252"), ("hi", "utf-8-sig"))
+
+    def test_wrong_declaration_falls_back(self):
+        text, encoding = decode_html("über".encode("utf-8") + b"\xff", "text/html; charset=utf-8")
+        self.assertIsInstance(text, str)
+        self.assertNotEqual(encoding, "utf-8")
+
+
+if __name__ == '__main__':
+    unittest.main()
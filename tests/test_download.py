@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+import cbor
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import download as download_module
+from utils.download import download, _read_limited, DOWNLOAD_STATS, DECODE_ERROR_STATUS
+
+
+def fake_response(body, content_length=None, chunk=4):
+    resp = Mock()
+    resp.headers = {} if content_length is None else {"Content-Length": str(content_length)}
+    resp.iter_content = Mock(side_effect=lambda chunk_size: (
+        body[i:i + chunk] for i in range(0, len(body), chunk)))
+    resp.ok = True
+    resp.status_code = 200
+    return resp
+
+
+class DownloadTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.old_stats = dict(DOWNLOAD_STATS)
+        DOWNLOAD_STATS.update(aborted=0, bytes_avoided=0)
+
+    def tearDown(self):
+        DOWNLOAD_STATS.update(self.old_stats)
+
+
+class TestReadLimited(DownloadTestCase):
+
+    def test_small_body(self):
+        self.assertEqual(_read_limited(fake_response(b"0123456789", 10), 10), b"0123456789")
+        self.assertEqual(_read_limited(fake_response(b"0123456789"), 10), b"0123456789")
+        self.assertEqual(DOWNLOAD_STATS, {"aborted": 0, "bytes_avoided": 0})
+
+    def test_content_length_over_limit(self):
+        resp = fake_response(b"x" * 100, 100)
+        self.assertIsNone(_read_limited(resp, 10))
+        resp.iter_content.assert_not_called()
+        self.assertEqual(DOWNLOAD_STATS, {"aborted": 1, "bytes_avoided": 100})
+
+    def test_no_content_length_over_limit(self):
+        self.assertIsNone(_read_limited(fake_response(b"x" * 100), 10))
+        # The size of the unread rest is unknown.
+        self.assertEqual(DOWNLOAD_STATS, {"aborted": 1, "bytes_avoided": 0})
+
+    def test_wrong_content_length(self):
+        self.assertIsNone(_read_limited(fake_response(b"x" * 100, 8), 10))
+        self.assertEqual(DOWNLOAD_STATS["aborted"], 1)
+
+
+class TestDownload(DownloadTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.config = Mock()
+        self.config.cache_server = ("localhost", 9000)
+        self.config.user_agent = "test"
+        self.config.download_timeout = 5
+        self.config.max_download_bytes = 64
+        self.logger = Mock()
+
+    def get(self, resp):
+        with patch.object(download_module.requests, "get", return_value=resp) as get:
+            result = download("https://www.ics.uci.edu/a", self.config, self.logger)
+        self.assertTrue(get.call_args.kwargs["stream"])
+        resp.close.assert_called_once()
+        return result
+
+    def test_oversized_is_413(self):
+        result = self.get(fake_response(b"x" * 100, 100))
+        self.assertEqual(result.status, 413)
+        self.assertEqual(result.url, "https://www.ics.uci.edu/a")
+        self.assertIsNone(result.raw_response)
+        self.assertEqual(DOWNLOAD_STATS, {"aborted": 1, "bytes_avoided": 100})
+
+    def test_decoded(self):
+        body = cbor.dumps({"url": "https://www.ics.uci.edu/a", "status": 200})
+        result = self.get(fake_response(body, len(body)))
+        self.assertEqual(result.status, 200)
+        self.assertEqual(DOWNLOAD_STATS["aborted"], 0)
+
+    def test_undecodable(self):
+        result = self.get(fake_response(b"\xff\xff\xff", 3))
+        self.assertEqual(result.status, DECODE_ERROR_STATUS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,288 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+import json
+from threading import Thread
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import Crawler
+from crawler.frontier import Frontier
+from utils import get_urlhash
+from utils.download import TIMEOUT_STATUS, DECODE_ERROR_STATUS
+from utils.canonical import TRACKING_PARAMS
+
+
+class FrontierTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.config = Mock()
+        self.config.save_file = os.path.join(self.tmpdir.name, "frontier.shelve")
+        self.config.seed_urls = ["https://www.ics.uci.edu"]
+        self.config.time_delay = 0
+        self.config.strip_params = TRACKING_PARAMS
+        self.config.fold_index = False
+        self.config.frontier_memory = 1000
+        self.config.frontier_order = "priority"
+        self.config.max_retries = 2
+        self.config.retry_backoff = 0
+        self.config.breaker_threshold = 2
+        self.config.breaker_cooldown = 60
+        self.config.breaker_max_cooldown = 900
+        self.config.breaker_max_probes = 5
+        self.config.recrawl_file = ""
+        self.config.recrawl = False
+        self.config.page_store = ""
+        self.config.report_file = ""
+        self.config.report_interval = 0
+        self.frontier = Frontier(self.config, restart=True)
+
+    def tearDown(self):
+        self.frontier.save.close()
+        os.chdir(self.old_cwd)
+        self.tmpdir.cleanup()
+
+    def drain(self):
+        urls = []
+        while True:
+            url = self.frontier.get_tbd_url()
+            if url is None:
+                return urls
+            urls.append(url)
+
+
+class TestAddUrls(FrontierTestCase):
+
+    def test_seeds_enqueued(self):
+        self.assertEqual(self.drain(), ["https://www.ics.uci.edu"])
+
+    def test_batch_deduped(self):
+        added = self.frontier.add_urls([
+            "https://www.ics.uci.edu/a",
+            "https://www.ics.uci.edu/a/",
+            "https://www.ics.uci.edu/a#top",
+            "https://www.ics.uci.edu/b",
+        ])
+        self.assertEqual(added, 2)
+        self.assertEqual(
+            sorted(self.drain()),
+            ["https://www.ics.uci.edu", "https://www.ics.uci.edu/a", "https://www.ics.uci.edu/b"])
+
+    def test_already_seen_skipped(self):
+        self.frontier.add_url("https://www.ics.uci.edu/a")
+        added = self.frontier.add_urls(["https://www.ics.uci.edu/a", "https://www.ics.uci.edu/c"])
+        self.assertEqual(added, 1)
+
+    def test_canonical_variants_deduped(self):
+        added = self.frontier.add_urls([
+            "http://WWW.ics.uci.edu:80/a/./b?utm_source=x&b=1&a=2",
+            "http://www.ics.uci.edu/a/b?a=2&b=1",
+        ])
+        self.assertEqual(added, 1)
+
+    def test_report_counters(self):
+        self.frontier.add_urls(["https://www.ics.uci.edu/a", "https://www.ics.uci.edu/b"])
+        url = "https://www.ics.uci.edu/a"
+        self.frontier.log_domain_count(url)
+        self.frontier.log_word_frequency(["the", "crawler", "crawler"])
+        self.frontier.mark_url_complete(url, 42)
+        report = self.frontier.save['report']
+        self.assertEqual(report.unique_pages, 3)
+        self.assertEqual(report.longest_page, (url, 42))
+        self.assertEqual(report.subdomains, {"www.ics.uci.edu": 1})
+        self.assertEqual(report.words.top(5), [("crawler", 2)])
+
+    def test_empty_batch(self):
+        self.assertEqual(self.frontier.add_urls([]), 0)
+
+
+class TestLoaders(FrontierTestCase):
+
+    def test_freshly_seeded(self):
+        self.assertTrue(self.frontier.freshly_seeded)
+        self.frontier.save.close()
+        self.frontier = Frontier(self.config, restart=False)
+        self.assertFalse(self.frontier.freshly_seeded)
+
+    def test_waits_for_running_loader(self):
+        self.frontier.add_loader()
+        self.assertEqual(self.frontier.get_tbd_url(), "https://www.ics.uci.edu")
+
+        def load():
+            time.sleep(0.2)
+            self.frontier.add_urls(["https://www.cs.uci.edu/a"])
+            self.frontier.remove_loader()
+
+        Thread(target=load).start()
+        self.assertEqual(self.frontier.get_tbd_url(), "https://www.cs.uci.edu/a")
+        self.assertIsNone(self.frontier.get_tbd_url())
+
+
+class TestReportExport(FrontierTestCase):
+
+    def test_final_export_after_crawl(self):
+        self.config.report_file = os.path.join(self.tmpdir.name, "report.json")
+        self.config.report_interval = 3600
+        self.config.min_threads = self.config.max_threads = 2
+        self.config.sitemaps = False
+        frontier = self.frontier
+
+        class PageWorker(Thread):
+            # Completes every queued url without downloading anything.
+            def __init__(self, worker_id, config, frontier):
+                super().__init__(daemon=True)
+                self.stop_requested = False
+                self.busy = False
+
+            def run(self):
+                while True:
+                    url = frontier.get_tbd_url()
+                    if url is None:
+                        return
+                    if url.count("/") < 4:
+                        frontier.add_urls([f"{url}/{i}" for i in range(3)], url)
+                    frontier.mark_url_complete(url, 10)
+
+        crawler = Crawler(self.config, True, lambda config, restart: frontier, PageWorker)
+        crawler.start()
+        with open(self.config.report_file) as f:
+            report = json.load(f)
+        self.assertEqual(report["unique_pages"], 13)
+        self.assertEqual(report["completed_pages"], 13)
+
+
+class TestPriorityOrder(FrontierTestCase):
+
+    def test_shallow_before_deep(self):
+        self.assertEqual(self.frontier.get_tbd_url(), "https://www.ics.uci.edu")
+        self.frontier.add_urls(["https://www.ics.uci.edu/a"], "https://www.ics.uci.edu")
+        self.assertEqual(self.frontier.get_tbd_url(), "https://www.ics.uci.edu/a")
+        self.frontier.add_urls(["https://www.ics.uci.edu/deep"], "https://www.ics.uci.edu/a")
+        self.frontier.add_urls(["https://www.cs.uci.edu/top"])
+        self.assertEqual(self.frontier.get_tbd_url(), "https://www.cs.uci.edu/top")
+        self.assertEqual(self.frontier.get_tbd_url(), "https://www.ics.uci.edu/deep")
+
+    def test_duplicate_parent_ranked_lower(self):
+        self.frontier.add_urls(["https://www.cs.uci.edu/dup"], page_info={"text_length": 0, "duplicate": "near"})
+        self.frontier.add_urls(["https://www.stat.uci.edu/good"], page_info={"text_length": 5000, "duplicate": None})
+        self.assertEqual(self.frontier.get_tbd_url(), "https://www.stat.uci.edu/good")
+
+
+class TestReadyDomains(FrontierTestCase):
+
+    def test_counts_hosts_not_waiting(self):
+        self.frontier.add_urls(["https://www.cs.uci.edu/a", "https://www.stat.uci.edu/b"])
+        self.assertEqual(self.frontier.depth(), 3)
+        self.assertEqual(self.frontier.ready_domains(), 3)
+        self.frontier.domain_last_access["www.cs.uci.edu"] = time.time() + 60
+        self.assertEqual(self.frontier.ready_domains(), 2)
+        self.drain()
+        self.assertEqual(self.frontier.ready_domains(), 0)
+
+
+class TestRetries(FrontierTestCase):
+
+    def response(self, status):
+        resp = Mock()
+        resp.status = status
+        return resp
+
+    def test_transient_failure_retried(self):
+        url = self.frontier.get_tbd_url()
+        self.assertTrue(self.frontier.retry_if_failed(url, self.response(503)))
+        self.assertEqual(self.frontier.get_tbd_url(), url)
+        self.assertTrue(self.frontier.retry_if_failed(url, self.response(DECODE_ERROR_STATUS)))
+        self.assertEqual(self.frontier.get_tbd_url(), url)
+        # out of retries
+        self.assertFalse(self.frontier.retry_if_failed(url, self.response(TIMEOUT_STATUS)))
+        self.assertNotIn(get_urlhash(url), self.frontier.save['retry_counts'])
+
+    def test_client_error_not_retried(self):
+        url = self.frontier.get_tbd_url()
+        self.assertFalse(self.frontier.retry_if_failed(url, self.response(404)))
+        self.assertFalse(self.frontier.retry_if_failed(url, self.response(200)))
+        self.assertIsNone(self.frontier.get_tbd_url())
+
+    def test_retry_keeps_score(self):
+        url = self.frontier.get_tbd_url()
+        score = self.frontier.in_flight[url][1]
+        patterns = dict(self.frontier.pattern_counts)
+        self.frontier.retry_if_failed(url, self.response(503))
+        self.assertEqual(self.frontier.get_tbd_url(), url)
+        self.assertEqual(self.frontier.in_flight[url][1], score)
+        self.assertEqual(dict(self.frontier.pattern_counts), patterns)
+        self.assertEqual(dict(self.frontier.queued_per_host), {})
+
+    def test_retry_count_persisted(self):
+        url = self.frontier.get_tbd_url()
+        self.frontier.retry_if_failed(url, self.response(500))
+        self.assertEqual(self.frontier.save['retry_counts'], {get_urlhash(url): 1})
+
+    def test_breaker_parks_host(self):
+        self.frontier.add_urls(["https://www.ics.uci.edu/a"])
+        for _ in range(2):
+            url = self.frontier.get_tbd_url()
+            self.frontier.retry_if_failed(url, self.response(502))
+        self.assertIn("www.ics.uci.edu", self.frontier.save['host_failures'])
+        # Only the other host is handed out while www.ics.uci.edu is parked.
+        self.frontier.add_urls(["https://www.cs.uci.edu/c"])
+        self.assertEqual(self.frontier.get_tbd_url(), "https://www.cs.uci.edu/c")
+        self.assertEqual(len(self.frontier.to_be_downloaded) + len(self.frontier.delayed), 2)
+        # Once the cooldown is over a single probe is let through.
+        self.frontier.breakers["www.ics.uci.edu"].open_until = 0
+        self.frontier.delayed = sorted((0,) + entry[1:] for entry in self.frontier.delayed)
+        self.assertIn("www.ics.uci.edu", self.frontier.get_tbd_url())
+        self.assertGreater(self.frontier.breakers["www.ics.uci.edu"].allow(), 0)
+
+    def test_dead_host_does_not_stall_crawl(self):
+        self.config.max_retries = 10
+        self.config.breaker_cooldown = 0.01
+        self.config.breaker_max_cooldown = 0.04
+        self.config.breaker_max_probes = 3
+        self.frontier.add_urls([f"https://www.ics.uci.edu/{i}" for i in range(40)])
+        self.frontier.add_urls(["https://www.cs.uci.edu/ok"])
+        started = time.time()
+        fetches = 0
+        while True:
+            url = self.frontier.get_tbd_url()
+            if url is None:
+                break
+            fetches += 1
+            self.assertLess(fetches, 100)
+            status = 200 if "www.cs.uci.edu" in url else 503
+            if not self.frontier.retry_if_failed(url, self.response(status)):
+                self.frontier.mark_url_complete(url, 0)
+        self.assertLess(time.time() - started, 5)
+        breaker = self.frontier.breakers["www.ics.uci.edu"]
+        self.assertTrue(breaker.given_up)
+        self.assertLessEqual(breaker.current_cooldown, 0.04)
+        self.assertEqual(self.frontier.delayed, [])
+        # Dropped urls are saved as done, so a resumed crawl skips them.
+        self.assertTrue(all(
+            value[1] for value in self.frontier.save.values()
+            if type(value) == tuple and len(value) == 2 and isinstance(value[1], bool)))
+
+    def test_probe_success_releases_host(self):
+        self.frontier.add_urls(["https://www.ics.uci.edu/a", "https://www.ics.uci.edu/b"])
+        breaker = self.frontier._breaker("https://www.ics.uci.edu")
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.open_until = 0
+        probe = self.frontier.get_tbd_url()
+        # The other urls of the host wait for the probe.
+        self.frontier.add_urls(["https://www.cs.uci.edu/c"])
+        self.assertEqual(self.frontier.get_tbd_url(), "https://www.cs.uci.edu/c")
+        self.assertEqual(len(self.frontier.delayed), 2)
+        self.assertGreater(self.frontier.delayed[0][0], time.time())
+        self.frontier.retry_if_failed(probe, self.response(200))
+        self.assertEqual([entry[0] for entry in self.frontier.delayed], [0, 0])
+        self.assertIn("www.ics.uci.edu", self.frontier.get_tbd_url())
+
+
+if __name__ == '__main__':
+    unittest.main()
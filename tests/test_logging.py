@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import get_logger, stop_logging, _LogQueueHandler, LOG_SAMPLE_RATE
+
+
+class TestLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+
+    def tearDown(self):
+        stop_logging()
+        os.chdir(self.old_cwd)
+        self.tmpdir.cleanup()
+
+    def read(self, name):
+        stop_logging()  # flushes the queue and the files
+        with open(os.path.join(self.tmpdir.name, "Logs", f"{name}.log")) as f:
+            return f.read()
+
+    def test_handler_added_once(self):
+        logger = get_logger("test-once")
+        self.assertIs(get_logger("test-once"), logger)
+        self.assertEqual(sum(isinstance(h, _LogQueueHandler) for h in logger.handlers), 1)
+        logger.info("only once")
+        self.assertEqual(self.read("test-once").count("only once"), 1)
+
+    def test_shared_file(self):
+        get_logger("test-worker-1", "test-workers").info("from one")
+        get_logger("test-worker-2", "test-workers").info("from two")
+        content = self.read("test-workers")
+        self.assertIn("test-worker-1 - INFO - from one", content)
+        self.assertIn("test-worker-2 - INFO - from two", content)
+
+    def test_per_page_messages_sampled(self):
+        logger = get_logger("test-sampled")
+        for i in range(2 * LOG_SAMPLE_RATE):
+            logger.info(f"Downloaded page {i}")
+        logger.warning("Downloaded a broken page")
+        logger.info("Found save file")
+        content = self.read("test-sampled")
+        self.assertEqual(content.count("INFO - Downloaded page"), 2)
+        self.assertIn("Downloaded a broken page", content)
+        self.assertIn("Found save file", content)
+
+    def test_logging_after_stop(self):
+        logger = get_logger("test-restart")
+        logger.info("before stop")
+        stop_logging()
+        logger.info("after stop")
+        content = self.read("test-restart")
+        self.assertIn("before stop", content)
+        self.assertIn("after stop", content)
+
+
+if __name__ == '__main__':
+    unittest.main()
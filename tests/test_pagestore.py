@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.pagestore import PageStore
+from utils import get_urlhash
+from scraper import extract_next_links
+
+
+class TestPageStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "pages")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_put_get_across_segments(self):
+        with PageStore(self.path, segment_bytes=200) as store:
+            for i in range(10):
+                store.put(f"https://www.ics.uci.edu/{i}", 200, {"Content-Type": "text/html"}, b"<p>%d</p>" % i * 20)
+            self.assertEqual(store.get("https://www.ics.uci.edu/3"),
+                             ("https://www.ics.uci.edu/3", 200, {"Content-Type": "text/html"}, b"<p>3</p>" * 20))
+            self.assertIsNone(store.get("https://www.ics.uci.edu/missing"))
+        self.assertGreater(len([name for name in os.listdir(self.path) if name.startswith("segment")]), 1)
+
+    def test_reopen_and_overwrite(self):
+        with PageStore(self.path) as store:
+            store.put("https://www.ics.uci.edu/a", 200, {}, b"old")
+            store.put("https://www.ics.uci.edu/b", 200, {}, b"b")
+        with PageStore(self.path) as store:
+            store.put("https://www.ics.uci.edu/a", 200, {}, b"new")
+        with PageStore(self.path, readonly=True) as store:
+            self.assertEqual(len(store), 2)
+            self.assertEqual(store.get("https://www.ics.uci.edu/a")[3], b"new")
+            self.assertEqual(store.hashes()[-1], get_urlhash("https://www.ics.uci.edu/a"))
+            with self.assertRaises(RuntimeError):
+                store.put("https://www.ics.uci.edu/c", 200, {}, b"c")
+
+    def test_unchanged_body_not_rewritten(self):
+        with PageStore(self.path) as store:
+            self.assertTrue(store.put("https://www.ics.uci.edu/a", 200, {}, b"same"))
+        size = os.path.getsize(os.path.join(self.path, "segment-000000.dat"))
+        with PageStore(self.path) as store:
+            # e.g. the same page fetched again on a recrawl
+            self.assertFalse(store.put("https://www.ics.uci.edu/a", 200, {"ETag": '"v2"'}, b"same"))
+        self.assertEqual(os.path.getsize(os.path.join(self.path, "segment-000000.dat")), size)
+        with PageStore(self.path) as store:
+            self.assertTrue(store.put("https://www.ics.uci.edu/a", 200, {}, b"changed"))
+            self.assertEqual(store.get("https://www.ics.uci.edu/a")[3], b"changed")
+
+    def test_index_without_digests(self):
+        with PageStore(self.path) as store:
+            store.put("https://www.ics.uci.edu/a", 200, {}, b"a")
+        index = os.path.join(self.path, "index")
+        with open(index) as f:
+            line = f.read()
+        with open(index, "w") as f:
+            f.write(line.rsplit(" ", 1)[0] + "\n")
+        with PageStore(self.path) as store:
+            self.assertEqual(store.get("https://www.ics.uci.edu/a")[3], b"a")
+            self.assertTrue(store.put("https://www.ics.uci.edu/a", 200, {}, b"a"))
+
+    def test_headers_case_insensitive(self):
+        with PageStore(self.path) as store:
+            store.put("https://www.ics.uci.edu/a", 200, {"content-type": "text/html"}, b"<a href='/b'>b</a>")
+        with PageStore(self.path, readonly=True) as store:
+            url, status, headers, content = store.get("https://www.ics.uci.edu/a")
+        self.assertEqual(headers.get("Content-Type"), "text/html")
+        self.assertEqual(headers["CONTENT-TYPE"], "text/html")
+        # A replayed page parses like the live one (as in reprocess.py).
+        resp = SimpleNamespace(
+            url=url, status=status, error=None,
+            raw_response=SimpleNamespace(url=url, content=content, headers=headers))
+        links, _ = extract_next_links(url, resp)
+        self.assertEqual(links, ["https://www.ics.uci.edu/b"])
+
+    def test_only_html_responses_stored(self):
+        with PageStore(self.path) as store:
+            resp = Mock()
+            resp.status = 200
+            resp.raw_response.content = b"%PDF"
+            resp.raw_response.headers = {"Content-Type": "application/pdf"}
+            self.assertFalse(store.put_response("https://www.ics.uci.edu/a.pdf", resp))
+            resp.raw_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+            self.assertTrue(store.put_response("https://www.ics.uci.edu/a", resp))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.priority import PriorityQueue
+from bench_frontier import compare, synthetic_site
+
+
+class TestPriorityQueue(unittest.TestCase):
+
+    def test_pops_in_score_order_across_segments(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            queue = PriorityQueue(os.path.join(tmp, "spill"), 8)
+            scores = [(i * 37) % 101 for i in range(100)]
+            for i, score in enumerate(scores):
+                queue.push(i, score)
+            self.assertLessEqual(len(queue.heap), 8)
+            popped = [queue.pop() for _ in range(100)]
+            self.assertEqual([scores[i] for i in popped], sorted(scores, reverse=True))
+            self.assertEqual(len(queue), 0)
+
+
+class TestFrontierOrder(unittest.TestCase):
+
+    def test_priority_beats_lifo(self):
+        # The default order should fetch more unique pages on every graph,
+        # including the ones without a trap that lifo walks into.
+        lifo, scored = compare([synthetic_site(seed) for seed in range(5)], 1000)
+        for lifo_unique, scored_unique in zip(lifo, scored):
+            self.assertGreater(scored_unique, lifo_unique)
+
+
+if __name__ == '__main__':
+    unittest.main()
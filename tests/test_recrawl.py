@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.recrawl import RecrawlCache
+
+
+class TestRecrawlCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "frontier.recrawl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def response(self, content, headers=None):
+        resp = Mock()
+        resp.status = 200
+        resp.raw_response.content = content
+        resp.raw_response.headers = headers or {}
+        return resp
+
+    def store(self, cache, resp):
+        page_info = {"text_length": 10, "duplicate": None, "content_hash": 7, "simhash": 9}
+        cache.store("https://www.ics.uci.edu/a", resp, ["https://www.ics.uci.edu/b"], ["x", "y", "x"], page_info)
+
+    def test_unchanged_body_reused(self):
+        cache = RecrawlCache(self.path, fresh=True)
+        self.store(cache, self.response(b"<html>a</html>"))
+        record = cache.lookup("https://www.ics.uci.edu/a", self.response(b"<html>a</html>"))
+        self.assertEqual(record["links"], ["https://www.ics.uci.edu/b"])
+        self.assertEqual(record["word_counts"], {"x": 2, "y": 1})
+        self.assertEqual(record["word_total"], 3)
+        self.assertIsNone(cache.lookup("https://www.ics.uci.edu/a", self.response(b"<html>b</html>")))
+        self.assertIsNone(cache.lookup("https://www.ics.uci.edu/c", self.response(b"<html>a</html>")))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_validators_checked_first(self):
+        cache = RecrawlCache(self.path, fresh=True)
+        self.store(cache, self.response(b"<html>a</html>", {"ETag": '"v1"'}))
+        self.assertIsNotNone(cache.lookup(
+            "https://www.ics.uci.edu/a", self.response(b"<html>changed</html>", {"ETag": '"v1"'})))
+
+    def test_exact_duplicates_not_stored(self):
+        cache = RecrawlCache(self.path, fresh=True)
+        resp = self.response(b"<html>a</html>")
+        cache.store("https://www.ics.uci.edu/a", resp, [], ["x"], {"duplicate": "exact", "content_hash": 7})
+        self.assertIsNone(cache.lookup("https://www.ics.uci.edu/a", resp))
+
+    def test_kept_unless_fresh(self):
+        cache = RecrawlCache(self.path, fresh=True)
+        self.store(cache, self.response(b"<html>a</html>"))
+        cache.db.close()
+        cache = RecrawlCache(self.path, fresh=False)
+        self.assertIsNotNone(cache.lookup("https://www.ics.uci.edu/a", self.response(b"<html>a</html>")))
+        cache.db.close()
+        cache = RecrawlCache(self.path, fresh=True)
+        self.assertIsNone(cache.lookup("https://www.ics.uci.edu/a", self.response(b"<html>a</html>")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import pickle
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.report import SpaceSaving, CrawlReport
+
+
+class TestSpaceSaving(unittest.TestCase):
+
+    def test_exact_below_capacity(self):
+        sketch = SpaceSaving(capacity=10)
+        for word in "a b a c a b".split():
+            sketch.update(word)
+        self.assertEqual(sketch.top(2), [("a", 3), ("b", 2)])
+
+    def test_bounded_and_finds_heavy_hitters(self):
+        rng = random.Random(3)
+        words = [f"w{min(int(rng.paretovariate(1.0)), 5000)}" for _ in range(50000)]
+        sketch = SpaceSaving(capacity=200)
+        for word in words:
+            sketch.update(word)
+        self.assertLessEqual(len(sketch), 200)
+        exact = [word for word, _ in Counter(words).most_common(10)]
+        self.assertEqual(set(word for word, _ in sketch.top(10)), set(exact))
+        for word, count in sketch.top(10):
+            self.assertLessEqual(count - sketch.errors[word], Counter(words)[word])
+            self.assertGreaterEqual(count, Counter(words)[word])
+
+    def test_pickle_round_trip(self):
+        sketch = SpaceSaving(capacity=2)
+        sketch.update("a", 5)
+        sketch.update("b", 1)
+        sketch = pickle.loads(pickle.dumps(sketch))
+        sketch.update("c", 1)
+        self.assertEqual(sketch.top(2), [("a", 5), ("c", 2)])
+
+
+class TestCrawlReport(unittest.TestCase):
+
+    def test_counters(self):
+        report = CrawlReport()
+        report.page_discovered(3)
+        report.page_completed("https://www.ics.uci.edu/a", 10)
+        report.page_completed("https://www.ics.uci.edu/b", 30)
+        report.domain_visited("https://www.ics.uci.edu/a")
+        report.domain_visited("https://WWW.ICS.UCI.EDU/b")
+        report.words_counted({"uci": 2, "crawler": 1})
+        data = report.to_dict()
+        self.assertEqual(data["unique_pages"], 3)
+        self.assertEqual(data["completed_pages"], 2)
+        self.assertEqual(data["longest_page"], {"url": "https://www.ics.uci.edu/b", "words": 30})
+        self.assertEqual(data["subdomains"], {"www.ics.uci.edu": 2})
+        self.assertEqual(data["top_words"][0], {"word": "uci", "count": 2})
+
+    def test_from_legacy_save(self):
+        save = {
+            "h1": ("https://www.ics.uci.edu/a", True),
+            "h2": ("https://www.ics.uci.edu/b", False),
+            "longest_page": ("https://www.ics.uci.edu/a", 12),
+            "subdomain_frequencies": {"www.ics.uci.edu": 1},
+            "word_frequency": {"statistics": 4, "the": 9},
+        }
+        report = CrawlReport.from_save(save, stop_words={"the"})
+        self.assertEqual((report.unique_pages, report.completed_pages), (2, 1))
+        self.assertEqual(report.longest_page, ("https://www.ics.uci.edu/a", 12))
+        self.assertEqual(report.words.top(5), [("statistics", 4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.pagestore import PageStore
+from reprocess import reprocess
+from utils.canonical import TRACKING_PARAMS
+
+
+class TestReprocess(unittest.TestCase):
+
+    def setUp(self):
+        # The frontier's logger writes to Logs/ in the working directory.
+        self.old_cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.store_dir = os.path.join(self.tmpdir.name, "pages")
+        with PageStore(self.store_dir) as store:
+            for i in range(100):
+                body = " ".join(f"word{i}x{j}" for j in range(60))
+                html = (f"<html><body><nav>Zebramenu Home Research</nav><main><p>{body}</p></main>"
+                        f"<footer>Zebrafooter Contact</footer></body></html>")
+                store.put(f"https://www.ics.uci.edu/page{i}", 200, {"content-type": "text/html"}, html.encode())
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.tmpdir.cleanup()
+
+    def run_reprocess(self, processes):
+        config = Mock()
+        config.save_file = os.path.join(self.tmpdir.name, f"reprocess-{processes}.shelve")
+        config.seed_urls = ["https://www.ics.uci.edu"]
+        config.time_delay = 0
+        config.strip_params = TRACKING_PARAMS
+        config.fold_index = False
+        config.frontier_memory = 1000
+        config.frontier_order = "priority"
+        config.recrawl = False
+        config.report_interval = 0
+        reprocess(config, self.store_dir, processes)
+        with open(f"{config.save_file}.json") as f:
+            report = json.load(f)
+        del report["updated"]
+        return report
+
+    def test_templates_independent_of_processes(self):
+        single = self.run_reprocess(1)
+        self.assertEqual(self.run_reprocess(4), single)
+        self.assertEqual(single["completed_pages"], 100)
+        # The template is stripped from every page, the first ones included.
+        words = {entry["word"] for entry in single["top_words"]}
+        self.assertNotIn("zebramenu", words)
+        self.assertNotIn("zebrafooter", words)
+        self.assertEqual(single["longest_page"]["words"], 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
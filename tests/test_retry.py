@@ -0,0 +1,42 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.retry import HostBreaker
+
+
+class TestHostBreaker(unittest.TestCase):
+
+    def test_open_probe_close(self):
+        breaker = HostBreaker(threshold=2, cooldown=10)
+        self.assertEqual(breaker.allow(0), 0)
+        breaker.record_failure(0)
+        self.assertEqual(breaker.allow(0), 0)
+        breaker.record_failure(0)
+        self.assertEqual(breaker.allow(5), 10)
+        self.assertEqual(breaker.allow(11), 0)  # probe
+        self.assertGreater(breaker.allow(11), 11)  # others wait for the probe
+        breaker.record_failure(11)
+        self.assertEqual(breaker.allow(12), 31)  # cooldown doubled
+        self.assertEqual(breaker.allow(31), 0)
+        breaker.record_success()
+        self.assertEqual(breaker.allow(31), 0)
+        self.assertEqual(breaker.state(), (0, 0.0, 10, 0))
+
+    def test_cooldown_capped_and_given_up(self):
+        breaker = HostBreaker(threshold=1, cooldown=10, max_cooldown=25, max_probes=3)
+        breaker.record_failure(0)
+        now = 0
+        for cooldown in (20, 25, 25):
+            self.assertFalse(breaker.given_up)
+            now = breaker.open_until
+            self.assertEqual(breaker.allow(now), 0)  # probe
+            breaker.record_failure(now)
+            self.assertEqual(breaker.open_until, now + cooldown)
+        self.assertTrue(breaker.given_up)
+        self.assertEqual(HostBreaker(1, 10, *breaker.state(), max_probes=3).failed_probes, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
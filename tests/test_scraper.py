@@ -4,6 +4,7 @@ import os
 from unittest.mock import Mock
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scraper
 from scraper import is_valid, extract_next_links
 
 
@@ -124,6 +125,23 @@ class TestIsValid(unittest.TestCase):
         self.assertTrue(is_valid("https://ics.uci.edu/page#section"))
         self.assertTrue(is_valid("https://ics.uci.edu/page.html#top"))
 
+class TestDuplicateStatus(unittest.TestCase):
+
+    def setUp(self):
+        scraper.SEEN_EXACT_HASHES.clear()
+        scraper.SEEN_SIMHASHES.clear()
+
+    def test_checked_in_crawl_order(self):
+        self.assertIsNone(scraper.duplicate_status(1, 0b1111))
+        self.assertEqual(scraper.duplicate_status(1, 0b1111), "exact")
+        self.assertEqual(scraper.duplicate_status(2, 0b1110), "near")
+        self.assertIsNone(scraper.duplicate_status(3, (1 << 64) - 1))
+
+    def test_short_page_without_fingerprints(self):
+        self.assertIsNone(scraper.duplicate_status(None))
+        self.assertIsNone(scraper.duplicate_status(None))
+
+
 class TestExtractNextLinks(unittest.TestCase):
     
     def create_mock_response(self, url, status, content):
@@ -0,0 +1,163 @@
+import unittest
+import gzip
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.sitemap import SitemapLoader, parse_sitemap, sitemaps_from_robots
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*urls):
+    entries = "".join(f"<url><loc> {url} </loc><lastmod>2024-01-01</lastmod></url>" for url in urls)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{entries}</urlset>'.encode()
+
+
+def index(*sitemaps):
+    entries = "".join(f"<sitemap><loc>{url}</loc></sitemap>" for url in sitemaps)
+    return f'<?xml version="1.0"?><sitemapindex {NS}>{entries}</sitemapindex>'.encode()
+
+
+def response(status, content=None):
+    raw = SimpleNamespace(content=content) if content is not None else None
+    return SimpleNamespace(status=status, raw_response=raw)
+
+
+class FakeFrontier(object):
+    def __init__(self):
+        self.batches = []
+
+    def wait_for_politeness(self, url):
+        pass
+
+    def add_urls(self, urls, parent=None, page_info=None):
+        self.batches.append(list(urls))
+        return len(urls)
+
+
+class TestParseSitemap(unittest.TestCase):
+
+    def test_urlset(self):
+        entries = list(parse_sitemap(urlset("https://www.ics.uci.edu/a", "https://www.ics.uci.edu/b")))
+        self.assertEqual(entries, [("url", "https://www.ics.uci.edu/a"), ("url", "https://www.ics.uci.edu/b")])
+
+    def test_index(self):
+        entries = list(parse_sitemap(index("https://www.ics.uci.edu/s1.xml.gz")))
+        self.assertEqual(entries, [("sitemap", "https://www.ics.uci.edu/s1.xml.gz")])
+
+    def test_gzip(self):
+        content = gzip.compress(urlset("https://www.stat.uci.edu/x"))
+        self.assertEqual(list(parse_sitemap(content)), [("url", "https://www.stat.uci.edu/x")])
+
+    def test_truncated_keeps_complete_entries(self):
+        content = urlset("https://www.ics.uci.edu/a", "https://www.ics.uci.edu/b")
+        entries = list(parse_sitemap(content[:content.index(b"<url>", 100)]))
+        self.assertEqual(entries, [("url", "https://www.ics.uci.edu/a")])
+
+    def test_corrupt_gzip(self):
+        content = gzip.compress(urlset("https://www.stat.uci.edu/x"))
+        self.assertEqual(list(parse_sitemap(content[:10] + b"\xff" * 8 + content[18:])), [])
+
+    def test_not_xml(self):
+        self.assertEqual(list(parse_sitemap(b"<html><body>Not found")), [])
+
+    def test_robots(self):
+        robots = "User-agent: *\nDisallow: /private\nSitemap: https://www.ics.uci.edu/sitemap_index.xml\n"
+        self.assertEqual(sitemaps_from_robots(robots), ["https://www.ics.uci.edu/sitemap_index.xml"])
+        self.assertEqual(sitemaps_from_robots("User-agent: *\n"), [])
+
+
+class TestSitemapLoader(unittest.TestCase):
+
+    def setUp(self):
+        # The loader's logger writes to Logs/ in the working directory.
+        self.old_cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.tmpdir.cleanup()
+
+    def load(self, pages, seeds):
+        fetched = []
+
+        def fetch(url, config, logger):
+            fetched.append(url)
+            return pages.get(url, response(404))
+
+        config = SimpleNamespace(seed_urls=seeds)
+        frontier = FakeFrontier()
+        added = SitemapLoader(config, frontier, fetch).load()
+        return added, frontier, fetched
+
+    def test_follows_robots_and_index(self):
+        pages = {
+            "https://www.ics.uci.edu/robots.txt": response(200, b"Sitemap: https://www.ics.uci.edu/index.xml\n"),
+            "https://www.ics.uci.edu/index.xml": response(200, index("https://www.ics.uci.edu/pages.xml.gz")),
+            "https://www.ics.uci.edu/pages.xml.gz": response(200, gzip.compress(urlset(
+                "https://www.ics.uci.edu/a", "https://www.ics.uci.edu/login", "https://example.com/b"))),
+        }
+        added, frontier, _ = self.load(pages, ["https://www.ics.uci.edu"])
+        self.assertEqual(added, 1)
+        self.assertEqual(frontier.batches, [["https://www.ics.uci.edu/a"]])
+
+    def test_standard_location_fallback(self):
+        pages = {
+            "https://www.stat.uci.edu/sitemap.xml": response(200, urlset("https://www.stat.uci.edu/x")),
+        }
+        added, _, fetched = self.load(pages, ["https://www.stat.uci.edu"])
+        self.assertEqual(added, 1)
+        self.assertIn("https://www.stat.uci.edu/sitemap.xml", fetched)
+
+    def test_other_domains_not_followed(self):
+        pages = {
+            "https://www.ics.uci.edu/robots.txt": response(200, (
+                b"Sitemap: https://cdn.example.com/sitemap.xml\n"
+                b"Sitemap: https://www.ics.uci.edu/index.xml\n")),
+            "https://www.ics.uci.edu/index.xml": response(200, index(
+                "https://tracker.example.net/s.xml", "ftp://www.ics.uci.edu/s.xml")),
+        }
+        _, _, fetched = self.load(pages, ["https://www.ics.uci.edu"])
+        self.assertEqual(fetched, ["https://www.ics.uci.edu/robots.txt", "https://www.ics.uci.edu/index.xml"])
+
+    def test_background_thread_registers_with_frontier(self):
+        frontier = FakeFrontier()
+        frontier.loaders = 0
+        frontier.add_loader = lambda: setattr(frontier, "loaders", frontier.loaders + 1)
+        frontier.remove_loader = lambda: setattr(frontier, "loaders", frontier.loaders - 1)
+        pages = {"https://www.stat.uci.edu/sitemap.xml": response(200, urlset("https://www.stat.uci.edu/x"))}
+        config = SimpleNamespace(seed_urls=["https://www.stat.uci.edu"])
+        loader = SitemapLoader(config, frontier, lambda url, config, logger: pages.get(url, response(404)))
+        loader.start()
+        loader.join()
+        self.assertEqual(loader.added, 1)
+        self.assertEqual(frontier.loaders, 0)
+
+    def test_corrupt_sitemap_skipped(self):
+        content = gzip.compress(urlset("https://www.ics.uci.edu/bad"))
+        pages = {
+            "https://www.ics.uci.edu/robots.txt": response(200, (
+                b"Sitemap: https://www.ics.uci.edu/bad.xml.gz\n"
+                b"Sitemap: https://www.ics.uci.edu/good.xml\n")),
+            "https://www.ics.uci.edu/bad.xml.gz": response(200, content[:10] + b"\xff" * 8 + content[18:]),
+            "https://www.ics.uci.edu/good.xml": response(200, urlset("https://www.ics.uci.edu/a")),
+        }
+        added, frontier, _ = self.load(pages, ["https://www.ics.uci.edu"])
+        self.assertEqual(added, 1)
+        self.assertEqual(frontier.batches, [["https://www.ics.uci.edu/a"]])
+
+    def test_sitemap_read_once(self):
+        pages = {
+            "https://www.cs.uci.edu/sitemap.xml": response(200, index(
+                "https://www.cs.uci.edu/sitemap.xml", "https://www.cs.uci.edu/sitemap.xml")),
+        }
+        _, _, fetched = self.load(pages, ["https://www.cs.uci.edu", "https://www.cs.uci.edu/"])
+        self.assertEqual(fetched.count("https://www.cs.uci.edu/sitemap.xml"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.spill import SpillQueue
+
+
+class TestSpillQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.spill_dir = os.path.join(self.tmpdir.name, "spill")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_matches_list_order(self):
+        queue = SpillQueue(self.spill_dir, 10)
+        expected = []
+        for i in range(57):
+            queue.append(f"https://ics.uci.edu/{i}")
+            expected.append(f"https://ics.uci.edu/{i}")
+            if i % 7 == 0:
+                self.assertEqual(queue.pop(), expected.pop())
+        self.assertLessEqual(len(queue.memory), 10)
+        self.assertTrue(os.listdir(self.spill_dir))
+        self.assertEqual(len(queue), len(expected))
+        while expected:
+            self.assertEqual(queue.pop(), expected.pop())
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(os.listdir(self.spill_dir), [])
+        with self.assertRaises(IndexError):
+            queue.pop()
+
+    def test_stale_segments_removed(self):
+        queue = SpillQueue(self.spill_dir, 4)
+        queue.extend(str(i) for i in range(20))
+        queue = SpillQueue(self.spill_dir, 4)
+        self.assertFalse(os.path.exists(self.spill_dir))
+        self.assertEqual(len(queue), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
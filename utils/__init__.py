@@ -1,24 +1,130 @@
 import os
+import atexit
+import itertools
 import logging
 from hashlib import sha256
+from queue import SimpleQueue
+from threading import Lock
+from logging.handlers import QueueHandler, QueueListener
 from urllib.parse import urlparse, urldefrag
 
+# All loggers put records on LOG_QUEUE; a single listener thread formats them
+# and writes to the log files and the console.
+LOG_QUEUE = SimpleQueue()
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Messages logged once or more per page. Only one in LOG_SAMPLE_RATE of each
+# is kept; everything else is logged in full.
+LOG_SAMPLED_PREFIXES = ("Downloaded ", "Politeness delay")
+LOG_SAMPLE_RATE = 20
+
+_log_files = {}
+_log_listener = None
+_log_setup_lock = Lock()
+_log_atexit = False
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    # Only flushed by _LogRouter once the queue is drained, not per record.
+    def flush(self):
+        pass
+
+    def drain(self):
+        with self.lock:
+            if self.stream:
+                self.stream.flush()
+
+
+class _LogRouter(logging.Handler):
+    # Runs on the listener thread; sends each record to its logger's file.
+    def emit(self, record):
+        handler = _log_files.get(record.logfile)
+        if handler is not None:
+            handler.handle(record)
+        if LOG_QUEUE.empty():
+            for handler in list(_log_files.values()):
+                handler.drain()
+
+
+class _LogQueueHandler(QueueHandler):
+    def __init__(self, logfile):
+        super().__init__(LOG_QUEUE)
+        self.logfile = logfile
+        self.addFilter(_sample_filter)
+
+    def emit(self, record):
+        # The listener may have been stopped by stop_logging; start it again.
+        if _log_listener is None:
+            with _log_setup_lock:
+                if _log_listener is None:
+                    _start_log_listener()
+        super().emit(record)
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.logfile = self.logfile
+        return record
+
+
+class _SampleFilter(logging.Filter):
+    def __init__(self):
+        super().__init__()
+        self.counters = {prefix: itertools.count() for prefix in LOG_SAMPLED_PREFIXES}
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING and isinstance(record.msg, str):
+            for prefix, counter in self.counters.items():
+                if record.msg.startswith(prefix):
+                    return next(counter) % LOG_SAMPLE_RATE == 0
+        return True
+
+
+_sample_filter = _SampleFilter()
+
+
+def _start_log_listener():
+    # Caller must hold _log_setup_lock.
+    global _log_listener, _log_atexit
+    console = logging.StreamHandler()
+    console.setLevel(logging.INFO)
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    _log_listener = QueueListener(
+        LOG_QUEUE, _LogRouter(), console, respect_handler_level=True)
+    _log_listener.start()
+    if not _log_atexit:
+        atexit.register(stop_logging)
+        _log_atexit = True
+
+
+def stop_logging():
+    # Flush everything still queued and close the log files. Called
+    # automatically at exit. Logging afterwards restarts the listener and
+    # reopens the files in append mode.
+    global _log_listener
+    with _log_setup_lock:
+        if _log_listener is not None:
+            _log_listener.stop()
+            _log_listener = None
+        for handler in list(_log_files.values()):
+            handler.close()
+
+
 def get_logger(name, filename=None):
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    if not os.path.exists("Logs"):
-        os.makedirs("Logs")
-    fh = logging.FileHandler(f"Logs/{filename if filename else name}.log")
-    fh.setLevel(logging.DEBUG)
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
-    formatter = logging.Formatter(
-       "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    fh.setFormatter(formatter)
-    ch.setFormatter(formatter)
-    # add the handlers to the logger
-    logger.addHandler(fh)
-    logger.addHandler(ch)
+    logfile = filename if filename else name
+    with _log_setup_lock:
+        if any(isinstance(h, _LogQueueHandler) for h in logger.handlers):
+            return logger
+        logger.setLevel(logging.INFO)
+        if not os.path.exists("Logs"):
+            os.makedirs("Logs")
+        if logfile not in _log_files:
+            fh = _BufferedFileHandler(f"Logs/{logfile}.log")
+            fh.setLevel(logging.DEBUG)
+            fh.setFormatter(logging.Formatter(LOG_FORMAT))
+            _log_files[logfile] = fh
+        if _log_listener is None:
+            _start_log_listener()
+        logger.addHandler(_LogQueueHandler(logfile))
     return logger
 
 
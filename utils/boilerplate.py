@@ -0,0 +1,92 @@
+import re
+from hashlib import blake2b
+from threading import Lock
+
+# Elements that usually hold a site's template (header, menus, footer).
+TEMPLATE_TAGS = {"header", "nav", "footer", "aside"}
+TEMPLATE_HINT = re.compile(r"header|nav|menu|footer|sidebar|breadcrumb", re.IGNORECASE)
+# A block seen on this many pages of a host is treated as boilerplate.
+MIN_PAGES = 3
+# Bound on the block hashes remembered per host.
+MAX_BLOCKS_PER_HOST = 5000
+
+
+def _is_candidate(tag):
+    if tag.name in TEMPLATE_TAGS:
+        return True
+    if tag.name not in ("div", "section", "ul", "table"):
+        return False
+    hints = " ".join(tag.get("class") or ()) + " " + (tag.get("id") or "")
+    return bool(TEMPLATE_HINT.search(hints))
+
+
+def candidate_blocks(soup):
+    # Outermost template-like elements; nested ones go with their parent.
+    blocks = soup.find_all(_is_candidate)
+    selected = set(map(id, blocks))
+    return [
+        block for block in blocks
+        if not any(id(parent) in selected for parent in block.parents)]
+
+
+def block_hash(text):
+    normalized = " ".join(text.lower().split())
+    return blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+
+
+class TemplateCache(object):
+    ''' Learns, per host, which blocks repeat across its pages.
+
+    Every page contributes the hashes of its candidate blocks. Once a block
+    hash has been seen on MIN_PAGES pages of the host it is part of the host's
+    template and is removed from later pages before their text is tokenized
+    and fingerprinted. A frozen cache only strips the templates it already
+    knows and learns nothing from the pages it sees. '''
+
+    def __init__(self, min_pages=MIN_PAGES, max_blocks=MAX_BLOCKS_PER_HOST):
+        self.min_pages = min_pages
+        self.max_blocks = max_blocks
+        self.lock = Lock()
+        self.counts = {}  # host -> {block hash: pages seen}, least recently seen first
+        self.templates = {}  # host -> set of boilerplate block hashes
+        self.frozen = False
+
+    def strip(self, host, soup):
+        # Removes known boilerplate blocks from soup. Returns how many.
+        blocks = []
+        for block in candidate_blocks(soup):
+            text = block.get_text(" ", strip=True)
+            if text:
+                blocks.append((block, block_hash(text)))
+        if not blocks:
+            return 0
+
+        with self.lock:
+            if not self.frozen:
+                self._learn(host, {digest for _, digest in blocks})
+            template = self.templates.get(host, ())
+            remove = [block for block, digest in blocks if digest in template]
+
+        for block in remove:
+            block.decompose()
+        return len(remove)
+
+    def learn(self, host, digests):
+        # Counts the block hashes of one page of host without stripping it.
+        with self.lock:
+            self._learn(host, set(digests))
+
+    def _learn(self, host, digests):
+        counts = self.counts.setdefault(host, {})
+        template = self.templates.setdefault(host, set())
+        for digest in digests:
+            # Re-inserted so the dict stays in order of last sighting.
+            counts[digest] = counts.pop(digest, 0) + 1
+            if counts[digest] >= self.min_pages:
+                template.add(digest)
+        while len(counts) > self.max_blocks:
+            # Forget the least recently seen block. A template that is
+            # still in use is seen on every page and never gets here.
+            oldest = next(iter(counts))
+            del counts[oldest]
+            template.discard(oldest)
@@ -0,0 +1,137 @@
+import re
+import shelve
+from argparse import ArgumentParser
+from configparser import ConfigParser
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Query parameters that only track the visitor or carry a session, and never
+# change the page that is served.
+TRACKING_PARAMS = frozenset({
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+    "fbclid", "gclid", "msclkid", "mc_cid", "mc_eid",
+    "sid", "sessionid", "phpsessid", "jsessionid", "aspsessionid",
+})
+
+INDEX_PAGES = ("index.html", "index.htm", "index.php")
+
+UNRESERVED = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+PERCENT_ESCAPE = re.compile(r"%([0-9A-Fa-f]{2})")
+
+
+def _decode_unreserved(match):
+    char = chr(int(match.group(1), 16))
+    if char in UNRESERVED:
+        return char
+    return "%" + match.group(1).upper()
+
+
+def _normalize_escapes(component):
+    if "%" not in component:
+        return component
+    return PERCENT_ESCAPE.sub(_decode_unreserved, component)
+
+
+def _remove_dot_segments(path):
+    # RFC 3986 section 5.2.4, on already split segments.
+    if "." not in path:
+        return path
+    output = []
+    for segment in path.split("/"):
+        if segment == ".":
+            continue
+        if segment == "..":
+            if len(output) > 1:
+                output.pop()
+            continue
+        output.append(segment)
+    if path.endswith(("/.", "/..")):
+        output.append("")
+    return "/".join(output)
+
+
+def _canonical_query(query, strip_params):
+    params = []
+    for param in query.split("&"):
+        if not param:
+            continue
+        key = param.split("=", 1)[0]
+        if key.lower() in strip_params:
+            continue
+        params.append(_normalize_escapes(param))
+    params.sort()
+    return "&".join(params)
+
+
+@lru_cache(maxsize=2 ** 16)
+def canonicalize(url, strip_params=TRACKING_PARAMS, fold_index=False):
+    # Rewrite a url to a single canonical form so that equivalent urls
+    # hash to the same frontier entry. strip_params must be a frozenset
+    # of lowercase parameter names (hashable for the cache).
+    try:
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").rstrip(".")
+        port = parts.port
+    except ValueError:
+        return url
+
+    # urlsplit drops the brackets of IPv6 literals.
+    netloc = f"[{host}]" if ":" in host else host
+    if parts.username is not None:
+        userinfo = parts.username
+        if parts.password is not None:
+            userinfo += ":" + parts.password
+        netloc = f"{userinfo}@{netloc}"
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+
+    path = _remove_dot_segments(_normalize_escapes(parts.path))
+    if fold_index:
+        head, _, last = path.rpartition("/")
+        if last in INDEX_PAGES:
+            path = head + "/"
+    # Same as utils.normalize: trailing slashes are not significant.
+    path = path.rstrip("/")
+
+    query = _canonical_query(parts.query, strip_params) if parts.query else ""
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def count_duplicates(urls, strip_params=TRACKING_PARAMS, fold_index=False):
+    # Replay a list of crawled urls and count how many fetches the
+    # canonical form would have saved.
+    seen = set()
+    duplicates = 0
+    for url in urls:
+        canonical = canonicalize(url, strip_params, fold_index)
+        if canonical in seen:
+            duplicates += 1
+        else:
+            seen.add(canonical)
+    return duplicates, len(seen)
+
+
+if __name__ == "__main__":
+    # python -m utils.canonical [--config_file config.ini] [save_file]
+    # Uses the STRIPPARAMS and FOLDINDEX settings of the config file.
+    from utils.config import Config
+
+    parser = ArgumentParser()
+    parser.add_argument("--config_file", type=str, default="config.ini")
+    parser.add_argument("save_file", nargs="?", default=None, help="defaults to SAVE")
+    args = parser.parse_args()
+    cparser = ConfigParser()
+    cparser.read(args.config_file)
+    config = Config(cparser)
+
+    with shelve.open(args.save_file or config.save_file, "r") as save:
+        urls = [value[0] for value in save.values() if type(value) == tuple]
+    duplicates, unique = count_duplicates(urls, config.strip_params, config.fold_index)
+    cache = canonicalize.cache_info()
+    print(f"Replayed {len(urls)} urls: {unique} canonical, "
+          f"{duplicates} duplicate fetches removed "
+          f"(cache hit rate {cache.hits / max(cache.hits + cache.misses, 1):.0%}).")
@@ -0,0 +1,70 @@
+import codecs
+import re
+
+from bs4 import UnicodeDammit
+
+# Only the start of a page is searched for a <meta> charset declaration;
+# HTML requires it within the first 1024 bytes.
+META_SCAN_BYTES = 2048
+HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+
+# Labels that browsers decode differently from Python's codec of that name.
+ENCODING_ALIASES = {
+    "iso8859-1": "cp1252",
+    "ascii": "utf-8",  # a page mislabeled as ascii is nearly always utf-8
+}
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _normalize(label):
+    try:
+        name = codecs.lookup(label.decode("ascii") if isinstance(label, bytes) else label).name
+    except (LookupError, UnicodeDecodeError):
+        return None
+    return ENCODING_ALIASES.get(name, name)
+
+
+def declared_charset(content, content_type=""):
+    # Charset from the Content-Type header, else from a <meta> tag near the
+    # start of the page. None if neither declares a known encoding.
+    match = HEADER_CHARSET.search(content_type or "")
+    if match:
+        charset = _normalize(match.group(1))
+        if charset:
+            return charset
+    match = META_CHARSET.search(content[:META_SCAN_BYTES])
+    if match:
+        return _normalize(match.group(1))
+    return None
+
+
+def decode_html(content, content_type=""):
+    # Decodes a page once. Returns (text, encoding used).
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return content.decode(encoding, errors="replace"), encoding
+
+    charset = declared_charset(content, content_type)
+    # Fast path: most pages are utf-8 (or plain ascii, a subset of it).
+    if charset in (None, "utf-8"):
+        try:
+            return content.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            pass
+    else:
+        try:
+            return content.decode(charset), charset
+        except UnicodeDecodeError:
+            pass
+
+    # Wrong or missing declaration: let bs4 detect the encoding.
+    dammit = UnicodeDammit(content, [charset] if charset else [], is_html=True)
+    if dammit.unicode_markup is not None:
+        return dammit.unicode_markup, dammit.original_encoding
+    return content.decode("utf-8", errors="replace"), "utf-8"
@@ -1,5 +1,7 @@
 import re
 
+from utils.canonical import TRACKING_PARAMS
+
 
 class Config(object):
     def __init__(self, config):
@@ -8,7 +10,23 @@ class Config(object):
         assert self.user_agent != "DEFAULT AGENT", "Set useragent in config.ini"
         assert re.match(r"^[a-zA-Z0-9_ ,]+$", self.user_agent), "User agent should not have any special characters outside '_', ',' and 'space'"
         self.threads_count = int(config["LOCAL PROPERTIES"]["THREADCOUNT"])
+        # The autoscaler keeps between MINTHREADS and MAXTHREADS workers; without
+        # them the crawler runs exactly THREADCOUNT workers.
+        self.min_threads = config["LOCAL PROPERTIES"].getint("MINTHREADS", fallback=self.threads_count)
+        self.max_threads = config["LOCAL PROPERTIES"].getint("MAXTHREADS", fallback=self.threads_count)
+        assert 1 <= self.min_threads <= self.max_threads, "Need 1 <= MINTHREADS <= MAXTHREADS"
         self.save_file = config["LOCAL PROPERTIES"]["SAVE"]
+        # Per url parse results for --recrawl; empty to disable.
+        self.recrawl_file = config["LOCAL PROPERTIES"].get("RECRAWLCACHE", fallback="").strip()
+        self.recrawl = False
+        # Running report exported as JSON at most every REPORTINTERVAL seconds.
+        self.report_file = config["LOCAL PROPERTIES"].get("REPORTFILE", fallback="").strip()
+        self.report_interval = config["LOCAL PROPERTIES"].getfloat("REPORTINTERVAL", fallback=30.0)
+        # Directory of the compressed page store; empty to disable.
+        self.page_store = config["LOCAL PROPERTIES"].get("PAGESTORE", fallback="").strip()
+        self.frontier_memory = config["LOCAL PROPERTIES"].getint("FRONTIERMEMORY", fallback=100_000)
+        self.frontier_order = config["CRAWLER"].get("FRONTIERORDER", fallback="priority").strip().lower()
+        assert self.frontier_order in ("priority", "lifo"), "FRONTIERORDER should be priority or lifo"
 
         self.host = config["CONNECTION"]["HOST"]
         self.port = int(config["CONNECTION"]["PORT"])
@@ -16,4 +34,22 @@ class Config(object):
         self.seed_urls = config["CRAWLER"]["SEEDURL"].split(",")
         self.time_delay = float(config["CRAWLER"]["POLITENESS"])
 
+        strip_params = config["CRAWLER"].get("STRIPPARAMS")
+        self.strip_params = (
+            frozenset(p.strip().lower() for p in strip_params.split(",") if p.strip())
+            if strip_params is not None else TRACKING_PARAMS)
+        self.download_timeout = config["CRAWLER"].getfloat("DOWNLOADTIMEOUT", fallback=30.0)
+        # Retries of transient failures, and the per host circuit breaker.
+        self.max_retries = config["CRAWLER"].getint("MAXRETRIES", fallback=3)
+        self.retry_backoff = config["CRAWLER"].getfloat("RETRYBACKOFF", fallback=5.0)
+        self.breaker_threshold = config["CRAWLER"].getint("BREAKERTHRESHOLD", fallback=5)
+        self.breaker_cooldown = config["CRAWLER"].getfloat("BREAKERCOOLDOWN", fallback=60.0)
+        self.breaker_max_cooldown = config["CRAWLER"].getfloat("BREAKERMAXCOOLDOWN", fallback=900.0)
+        self.breaker_max_probes = config["CRAWLER"].getint("BREAKERMAXPROBES", fallback=5)
+        self.fold_index = config["CRAWLER"].getboolean("FOLDINDEX", fallback=False)
+        # Seed the frontier from the seed domains' sitemaps on a fresh start.
+        self.sitemaps = config["CRAWLER"].getboolean("SITEMAPS", fallback=False)
+        # Ceiling on the cache server payload (page + envelope), in bytes.
+        self.max_download_bytes = config["CRAWLER"].getint("MAXDOWNLOADBYTES", fallback=2_100_000)
+
         self.cache_server = None
\ No newline at end of file
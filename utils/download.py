@@ -1,21 +1,88 @@
 import requests
 import cbor
 import time
+from threading import Lock
 
 from utils.response import Response
 
+# Statuses below 100 are failures of the request to the cache server itself.
+TIMEOUT_STATUS = 1
+CONNECTION_ERROR_STATUS = 2
+DECODE_ERROR_STATUS = 3
+
+# Bytes skipped by aborting oversized cache responses, for the whole run.
+DOWNLOAD_STATS = {"aborted": 0, "bytes_avoided": 0}
+DOWNLOAD_STATS_LOCK = Lock()
+
+
+def _record_abort(bytes_avoided):
+    with DOWNLOAD_STATS_LOCK:
+        DOWNLOAD_STATS["aborted"] += 1
+        DOWNLOAD_STATS["bytes_avoided"] += bytes_avoided
+
+
+def _read_limited(resp, limit):
+    # Read the body in chunks and stop as soon as it crosses limit.
+    # Returns None if the body was too large.
+    content_length = resp.headers.get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        _record_abort(int(content_length))
+        return None
+
+    chunks = []
+    received = 0
+    for chunk in resp.iter_content(chunk_size=64 * 1024):
+        received += len(chunk)
+        if received > limit:
+            # Without a Content-Length the unread remainder is unknown,
+            # so only the advertised size is counted as avoided.
+            if content_length and content_length.isdigit():
+                _record_abort(int(content_length) - received)
+            else:
+                _record_abort(0)
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
 def download(url, config, logger=None):
     host, port = config.cache_server
-    resp = requests.get(
-        f"http://{host}:{port}/",
-        params=[("q", f"{url}"), ("u", f"{config.user_agent}")])
     try:
-        if resp and resp.content:
-            return Response(cbor.loads(resp.content))
+        resp = requests.get(
+            f"http://{host}:{port}/",
+            params=[("q", f"{url}"), ("u", f"{config.user_agent}")],
+            stream=True, timeout=config.download_timeout)
+        try:
+            content = _read_limited(resp, config.max_download_bytes)
+        finally:
+            resp.close()
+    except requests.exceptions.Timeout as e:
+        logger.error(f"Timeout downloading {url}: {e}")
+        return Response({
+            "error": f"Timeout downloading {url}.",
+            "status": TIMEOUT_STATUS,
+            "url": url})
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Connection error downloading {url}: {e}")
+        return Response({
+            "error": f"Connection error downloading {url}.",
+            "status": CONNECTION_ERROR_STATUS,
+            "url": url})
+    if content is None:
+        logger.info(
+            f"Aborted {url}: cache response over {config.max_download_bytes} bytes.")
+        return Response({
+            "error": f"Response for {url} exceeds {config.max_download_bytes} bytes.",
+            "status": 413,
+            "url": url})
+    try:
+        if resp and content:
+            return Response(cbor.loads(content))
     except (EOFError, ValueError) as e:
         pass
     logger.error(f"Spacetime Response error {resp} with url {url}.")
     return Response({
         "error": f"Spacetime Response error {resp} with url {url}.",
-        "status": resp.status_code,
+        # A successful response that cannot be decoded is a decode error.
+        "status": DECODE_ERROR_STATUS if resp.ok else resp.status_code,
         "url": url})